@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# Copyright (c) Merchise Autrement [~º/~] and Contributors
+# All rights reserved.
+#
+# This is free software; you can do what the LICENCE file allows you to.
+#
+"""Benchmarks of `xoeuf.osv.expression`.
+
+The domains are generated randomly (but deterministically, see ``--seed``)
+in several sizes: the number of terms and the depth of nested operators
+grow together.  They mix all the operators, values of several types
+(including False) and dotted paths.
+
+No database is needed, only an importable ``odoo``.
+
+Usage::
+
+    python benchmarks/domains.py                     # run and print
+    python benchmarks/domains.py --save base.json    # store a baseline
+    python benchmarks/domains.py --compare base.json # fail on regressions
+
+Each benchmark reports the throughput (operations per second) and the peak
+of memory allocated during a single operation (measured with
+`tracemalloc`:mod:).  When comparing with a baseline, the exit status is 1
+if any throughput is lower (or any peak higher) than allowed by
+``--tolerance``.
+
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+from xoeuf import signals
+from xoeuf.osv import expression
+from xoeuf.osv.expression import Domain
+
+# The fields in the generated domains, with the kind of their values.
+FIELDS = {
+    "name": "str",
+    "state": "str",
+    "age": "int",
+    "partner_id": "int",
+    "partner_id.name": "str",
+    "line_ids.state": "str",
+    "line_ids.qty": "int",
+    "line_ids.product_id.type": "str",
+}
+
+OPERATORS = {
+    "str": ["=", "!=", "in", "not in", "like", "ilike", "not like", "not ilike"],
+    "int": ["=", "!=", "<", "<=", ">", ">=", "in", "not in"],
+}
+
+STRINGS = ["draft", "open", "done", "cancel", "a", "b"]
+
+# (terms, depth) of each size.
+SIZES = {"small": (4, 1), "medium": (16, 2), "large": (64, 3), "huge": (256, 4)}
+
+# The number of domains of each size used by every benchmark.
+SAMPLES = 10
+
+# Domains as common as the searches of any model.
+EVERYDAY_DOMAINS = [
+    [
+        ("date", ">=", "2021-01-01"),
+        ("date", "<", "2021-02-01"),
+        ("state", "=", "done"),
+        ("company_id", "=", 1),
+    ],
+    ["|", ("state", "=", "a"), ("state", "=", "b")],
+    [("res_id", "=", 1), ("model", "=", "res.partner")],
+]
+
+
+def generate_value(rng, kind, operator):
+    if operator in ("in", "not in"):
+        return [generate_value(rng, kind, "=") for _ in range(rng.randint(0, 4))]
+    elif kind == "int":
+        if operator in ("=", "!=") and rng.random() < 0.1:
+            return False
+        return rng.randint(0, 10)
+    else:
+        if operator in ("=", "!=") and rng.random() < 0.1:
+            return False
+        return rng.choice(STRINGS)
+
+
+def generate_term(rng, paths=True):
+    fields = [f for f in FIELDS if paths or "." not in f]
+    field = rng.choice(fields)
+    kind = FIELDS[field]
+    operator = rng.choice(OPERATORS[kind])
+    return (field, operator, generate_value(rng, kind, operator))
+
+
+def generate_domain(rng, terms, depth, paths=True):
+    """Return a domain with `terms` terms nested up to `depth` levels."""
+    if depth <= 0 or terms < 4:
+        operator = rng.choice("&|")
+        result = [operator] * (terms - 1)
+        result.extend(generate_term(rng, paths=paths) for _ in range(terms))
+    else:
+        parts = rng.randint(2, 4)
+        sizes = [terms // parts] * parts
+        sizes[0] += terms - sum(sizes)
+        operator = rng.choice("&|")
+        result = [operator] * (parts - 1)
+        for size in sizes:
+            result.extend(generate_domain(rng, size, depth - 1, paths=paths))
+    if rng.random() < 0.1:
+        result.insert(0, "!")
+    return result
+
+
+def generate_record(rng):
+    return SimpleNamespace(
+        **{
+            field: (rng.choice(STRINGS) if kind == "str" else rng.choice(range(11)))
+            for field, kind in FIELDS.items()
+            if "." not in field
+        }
+    )
+
+
+def clear_caches():
+    """Clear the global caches of `xoeuf.osv.expression`."""
+    for name in ("clear_filter_cache", "clear_sql_cache"):
+        getattr(expression, name, lambda: None)()
+    tree_cache = getattr(expression, "_get_canonical_tree", None)
+    if tree_cache is not None:
+        tree_cache.cache_clear()
+
+
+def make_benchmarks(rng, terms, depth):
+    domains = [generate_domain(rng, terms, depth) for _ in range(SAMPLES)]
+    plain = [generate_domain(rng, terms, depth, paths=False) for _ in range(SAMPLES)]
+    records = [generate_record(rng) for _ in range(100)]
+    # Half of the pairs imply, so that `implies` has to find the proof; the
+    # other half (most likely) don't.
+    pairs = [(Domain.AND(a, b), b) for a, b in zip(domains, plain)]
+    pairs.extend(zip(domains, plain))
+
+    def first_normal_form():
+        for d in domains:
+            Domain(d).first_normal_form
+
+    def second_normal_form():
+        for d in domains:
+            Domain(d).second_normal_form
+
+    def simplified():
+        clear_caches()
+        for d in domains:
+            Domain(d).simplified
+
+    def simplified_cached():
+        for d in domains:
+            Domain(d).simplified
+
+    def implies():
+        clear_caches()
+        for a, b in pairs:
+            Domain(a).implies(b)
+
+    def and_or():
+        Domain.AND(*domains)
+        Domain.OR(*domains)
+
+    def asfilter():
+        clear_caches()
+        for d in domains:
+            Domain(d).asfilter()
+
+    def asfilter_cached():
+        for d in domains:
+            Domain(d).asfilter()
+
+    filters = [Domain(d).asfilter() for d in plain]
+    searched = EVERYDAY_DOMAINS + plain
+
+    def search_precheck():
+        # What every search() of models without receivers does besides
+        # calling Odoo.
+        for d in searched:
+            signals._is_trivially_unsatisfiable(d)
+
+    def filter_records():
+        for f in filters:
+            for record in records:
+                f(record)
+
+    return [
+        ("1nf", first_normal_form),
+        ("2nf", second_normal_form),
+        ("simplified", simplified),
+        ("simplified-cached", simplified_cached),
+        ("implies", implies),
+        ("and-or", and_or),
+        ("asfilter", asfilter),
+        ("asfilter-cached", asfilter_cached),
+        ("filter-records", filter_records),
+        ("search-precheck", search_precheck),
+    ]
+
+
+def measure(fn, min_time):
+    """Return the operations per second and the peak of memory (KiB)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    while elapsed < min_time:
+        number *= 2
+        elapsed = timer.timeit(number)
+    return number / elapsed, peak / 1024
+
+
+def run(args):
+    results = {}
+    for size in args.sizes:
+        terms, depth = SIZES[size]
+        rng = random.Random("%s-%s" % (args.seed, size))
+        for name, fn in make_benchmarks(rng, terms, depth):
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            key = "%s/%s" % (name, size)
+            ops, peak = measure(fn, args.min_time)
+            results[key] = {"ops": ops, "peak_kib": peak}
+            print("%-28s %12.2f ops/s %12.1f KiB" % (key, ops, peak), flush=True)
+    return results
+
+
+def get_revision():
+    try:
+        output = subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    else:
+        return output.decode().strip()
+
+
+def compare(results, baseline, tolerance):
+    """Print the comparison with the `baseline` and return the regressions."""
+    regressions = []
+    print()
+    print("%-28s %10s %10s" % ("benchmark", "ops", "memory"))
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if not base:
+            continue
+        speed = result["ops"] / base["ops"]
+        memory = result["peak_kib"] / base["peak_kib"] if base["peak_kib"] else 1
+        mark = ""
+        if speed < 1 - tolerance or memory > 1 + tolerance:
+            regressions.append(key)
+            mark = "  <-- regression"
+        print("%-28s %9.2fx %9.2fx%s" % (key, speed, memory, mark))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(SIZES),
+        default=list(SIZES),
+        help="The sizes of the domains (default: all).",
+    )
+    parser.add_argument(
+        "--only", nargs="+", help="Run only the benchmarks containing these names."
+    )
+    parser.add_argument("--seed", default="xoeuf", help="The seed of the domains.")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="The minimum time (in seconds) to run each benchmark.",
+    )
+    parser.add_argument("--save", metavar="FILE", help="Store the results as JSON.")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="Compare the results with a baseline."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The allowed fraction of change with the baseline (default: 0.25).",
+    )
+    args = parser.parse_args(argv)
+    results = run(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "revision": get_revision(),
+                    "python": platform.python_version(),
+                    "seed": args.seed,
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("seed") != args.seed:
+            print("The baseline was generated with another seed.", file=sys.stderr)
+            return 2
+        if compare(results, baseline["results"], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
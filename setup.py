@@ -57,7 +57,6 @@ setup(
         'enum34; python_version < "3.4"',
         "celery>=4.1.0,<6",
         'typing;python_version<"3.5"',
-        "expiringdict~=1.2.0",
         'dataclasses;python_version<"3.7"',
     ],
     extra_requires={
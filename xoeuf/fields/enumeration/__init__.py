@@ -40,7 +40,9 @@ class Enumeration(Char, _EnumeratedField):
     attribute.
 
     The column in the DB will be of type CHAR and the values are the name of
-    attribute in the enumeration class.
+    attribute in the enumeration class.  With ``storage='int'`` the column
+    is a SMALLINT and the values are the codes of the members; see
+    `get_enumeration_codes`:func: and `convert_enumeration_column`:func:.
 
     Enumeration classes are required to:
 
@@ -104,6 +106,13 @@ class Enumeration(Char, _EnumeratedField):
     .. versionchanged:: 0.66.0 The function `compute_member_string` must now
        take three arguments: the model, the name and the value.
 
+    .. versionchanged:: 2.9.0 Members are found by value with an index built
+       in `setup_full`.  If any member has an unhashable value, there's no
+       index and members are found by comparing the value with each member
+       (in the order of ``__members__``), as before.
+
+    .. versionchanged:: 2.9.0 Add the parameters 'storage' and 'codes'.
+
     """
 
     type = "enumeration"
@@ -113,9 +122,16 @@ class Enumeration(Char, _EnumeratedField):
         "selection_field_kwargs": None,
         "compute_member_string": None,
         "Enumclass": None,
+        "_members_by_value": None,
+        "storage": "char",
+        "codes": None,
+        "_codes": None,
+        "_members_by_code": None,
     }
 
     def __init__(self, enumclass, *args, **kwargs):
+        if kwargs.get("storage", "char") not in STORAGES:
+            raise ValueError("Invalid storage %r" % kwargs["storage"])
         selection_field_kwargs = kwargs.pop("selection_field_kwargs", {})
         if not selection_field_kwargs:
             SELECTION_FIELD_PREFIX = "selection_field_"
@@ -146,6 +162,13 @@ class Enumeration(Char, _EnumeratedField):
             enumclass=enumclass, selection_field_kwargs=selection_field_kwargs, **kwargs
         )
 
+    @property
+    def column_type(self):
+        if self.storage == "int":
+            return ("int2", "smallint")
+        else:
+            return super(Enumeration, self).column_type
+
     def resolve_enumclass(self, model):
         enumclass = import_object(self.enumclass)
 
@@ -235,11 +258,11 @@ class Enumeration(Char, _EnumeratedField):
         @api.multi
         @api.depends(field_name)
         def _compute_selection_field(rs):
-            enumclass = self.resolve_enumclass(rs)
+            field = rs._fields[field_name]
             for record in rs:
                 value = getattr(record, field_name, None)
                 if value is not None:
-                    member = _get_member_by_value(enumclass, value)
+                    member = field.get_member_by_value(value)
                     setattr(record, selection_field_name, member.name)
                 else:
                     setattr(record, selection_field_name, False)
@@ -277,8 +300,34 @@ class Enumeration(Char, _EnumeratedField):
         return name
 
     def get_member_by_value(self, value, record=None):
+        index = self._members_by_value
+        if index is not None:
+            try:
+                return index[value]
+            except KeyError:
+                raise ValueError(
+                    "Invalid member %r of enumeration %r" % (value, self.Enumclass)
+                )
+            except TypeError:
+                # An unhashable value may still be equal to some member.
+                pass
         return _get_member_by_value(self.Enumclass, value)
 
+    def _get_member_db_value(self, member):
+        if self.storage == "int":
+            return self._codes[member.name]
+        else:
+            return member.name
+
+    def _is_member_value(self, value):
+        index = self._members_by_value
+        if index is not None:
+            try:
+                return value in index
+            except TypeError:
+                pass
+        return value in self.Enumclass.__members__.values()
+
     def get_member_by_name(self, name):
         return _get_member_by_name(self.Enumclass, name)
 
@@ -307,6 +356,13 @@ class Enumeration(Char, _EnumeratedField):
                     "Setting %s to model %s(%s, %s)", self, model, cls, id(cls)
                 )
             self.Enumclass = self.resolve_enumclass(model)
+            self._members_by_value = _get_members_index(self.Enumclass)
+            if self.storage == "int":
+                self._codes = get_enumeration_codes(self.Enumclass, self.codes)
+                self._members_by_code = {}
+                for name, code in self._codes.items():
+                    member = Member(name, self.Enumclass.__members__[name])
+                    self._members_by_code.setdefault(code, member)
             result = super(Enumeration, self).setup_full(model)
             if not self.compute and not self.related and not model._abstract:
                 assert self.name in model.fields_get()
@@ -331,7 +387,7 @@ class Enumeration(Char, _EnumeratedField):
 
     def convert_to_write(self, value, record):
         if value is not None and value is not False:
-            if value in self.Enumclass.__members__.values():
+            if self._is_member_value(value):
                 member = self.get_member_by_value(value)
                 # Our EnumerationAdapter takes care of doing the right
                 # thing when writing to the DB, also convert_to_column
@@ -340,7 +396,12 @@ class Enumeration(Char, _EnumeratedField):
         return value
 
     def convert_to_cache(self, value, record, validate=True):
-        if value not in self.Enumclass.__members__.values():
+        if self.storage == "int" and _is_code(value):
+            # The codes of members with int values are the values.
+            member = self._members_by_code.get(value, None)
+            if member is not None:
+                return member.value
+        if not self._is_member_value(value):
             if value is not None and value is not False:
                 return self.get_member_by_name(value).value
         return value
@@ -350,7 +411,15 @@ class Enumeration(Char, _EnumeratedField):
     # either; but declare them both to work across the three Odoo
     # versions.
     def convert_to_column(self, value, record, values=None, validate=True):
-        if value in self.Enumclass.__members__.values():
+        if self.storage == "int":
+            if value is None or value is False:
+                return None
+            elif self._is_member_value(value):
+                return self._get_member_db_value(self.get_member_by_value(value))
+            else:
+                # The adapter has already converted the value.
+                return int(value)
+        elif self._is_member_value(value):
             return Char.convert_to_column(
                 self, self.get_member_by_value(value).name, record
             )
@@ -378,67 +447,217 @@ class Adapter(object):
 class EnumerationAdapter(Adapter):
     "Adapt the create/write/search method to Enumeration fields."
 
+    # The names of the Enumeration fields of the model (including related
+    # ones), and the plans to rewrite the domains by shape.  Both are set in
+    # `_setup_complete`.
+    _enumeration_fnames = frozenset()
+    _enumeration_search_plans = None
+
     @api.model
-    @api.returns(*models.BaseModel.search._returns)
-    def search(self, args, *pos_args, **kwargs):
-        for index, query_part in enumerate(args):
-            if not isinstance(query_part, str):
-                fieldname, operator, operands = query_part
-                field = self._fields.get(fieldname, None)
-                if isinstance(field, Enumeration):
-                    if operator in (
-                        "=",
-                        "!=",
-                        "ilike",
-                        "not ilike",
-                        "like",
-                        "not like",
-                        "=like",
-                        "=ilike",
-                    ):
-                        values = _get_db_value(field, operands)
-                    elif operator in ("in", "not in"):
-                        values = [_get_db_value(field, o) for o in operands]
-                    else:
-                        raise TypeError(
-                            "Unsupported operator %r for an enumeration field"
-                            % operator
+    def _setup_complete(self):
+        super(EnumerationAdapter, self)._setup_complete()
+        # Computed from the final fields: a model may override an inherited
+        # Enumeration with another kind of field.
+        cls = type(self)
+        cls._enumeration_fnames = frozenset(
+            name
+            for name, field in cls._fields.items()
+            if isinstance(field, Enumeration)
+        )
+        cls._enumeration_search_plans = {}
+
+    @api.model
+    def _search(self, args, *pos_args, **kwargs):
+        plan = self._get_enumeration_search_plan(args)
+        if plan:
+            args = list(args)
+            expanded = {}
+            for index, field in plan:
+                fieldname, operator, operands = args[index]
+                if operator in ("in", "not in"):
+                    values = [_get_search_value(field, o) for o in operands]
+                    if field.storage == "int" and any(map(_is_zero_code, values)):
+                        expanded[index] = _get_zero_code_terms(
+                            fieldname, operator, values
                         )
-                    args[index] = (fieldname, operator, values)
-        return super(EnumerationAdapter, self).search(args, *pos_args, **kwargs)
+                else:
+                    values = _get_search_value(field, operands)
+                args[index] = (fieldname, operator, values)
+            if expanded:
+                args = [
+                    term
+                    for index, arg in enumerate(args)
+                    for term in expanded.get(index, [arg])
+                ]
+        return super(EnumerationAdapter, self)._search(args, *pos_args, **kwargs)
+
+    @api.model
+    def _get_enumeration_search_plan(self, args):
+        """Return the leaves of `args` over Enumeration fields.
+
+        The result is a tuple of pairs ``(index, field)``.  The `field` is the
+        Enumeration field at the end of the leaf's path.  The plan only
+        depends on the fields and operators in `args`, so it's computed once
+        per shape of domain.
+
+        """
+        shape = tuple(
+            term if isinstance(term, str) else tuple(term[:2]) for term in args
+        )
+        plans = type(self)._enumeration_search_plans
+        result = plans.get(shape)
+        if result is None:
+            result = []
+            for index, term in enumerate(shape):
+                if not isinstance(term, str):
+                    path, operator = term
+                    field = _get_enumeration_field(self, path)
+                    if field is not None:
+                        _check_operator(field, operator)
+                        result.append((index, field))
+            result = tuple(result)
+            if len(plans) >= SEARCH_PLANS_SIZE:
+                plans.clear()
+            plans[shape] = result
+        return result
 
     @api.model_create_multi
     @api.returns("self", lambda value: value.id)
     def create(self, values):
+        # Only the dicts with Enumeration fields are copied, the caller may
+        # reuse them.
         if isinstance(values, Mapping):
-            values = {
-                fieldname: _get_db_value(self._fields.get(fieldname, None), value)
-                for fieldname, value in values.items()
-            }
+            values = _convert_db_values(self, values, copy=True)
         else:
-            values = [
-                {
-                    fieldname: _get_db_value(self._fields.get(fieldname, None), value)
-                    for fieldname, value in vals.items()
-                }
-                for vals in values
-            ]
+            values = [_convert_db_values(self, vals, copy=True) for vals in values]
         return super(EnumerationAdapter, self).create(values)
 
     @api.multi
     def write(self, values):
-        for fieldname, value in dict(values).items():
-            field = self._fields.get(fieldname, None)
-            values[fieldname] = _get_db_value(field, value)
+        _convert_db_values(self, values)
         return super(EnumerationAdapter, self).write(values)
 
 
+def _convert_db_values(model, values, copy=False):
+    """Convert the values of the Enumeration fields in `values`.
+
+    The conversion is done in place, unless `copy` is True and there's
+    something to convert.  Return the converted values.
+
+    """
+    fnames = model._enumeration_fnames
+    if fnames.isdisjoint(values):
+        return values
+    if copy:
+        values = dict(values)
+    for fname in fnames:
+        if fname in values:
+            values[fname] = _get_db_value(model._fields[fname], values[fname])
+    return values
+
+
+# The maximum number of shapes of domains per model whose plan is kept.
+SEARCH_PLANS_SIZE = 1024
+
+SEARCH_OPERATORS = {
+    "char": (
+        "=",
+        "!=",
+        "ilike",
+        "not ilike",
+        "like",
+        "not like",
+        "=like",
+        "=ilike",
+        "in",
+        "not in",
+    ),
+    "int": ("=", "!=", "in", "not in"),
+}
+
+STORAGES = tuple(SEARCH_OPERATORS)
+
+# The range of SMALLINT in PostgreSQL.
+MIN_CODE, MAX_CODE = -32768, 32767
+
+
+def _check_operator(field, operator):
+    if operator not in SEARCH_OPERATORS[field.storage]:
+        raise TypeError("Unsupported operator %r for an enumeration field" % operator)
+
+
+def _is_code(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_zero_code(value):
+    return _is_code(value) and value == 0
+
+
+def _get_zero_code_terms(fieldname, operator, values):
+    """Return the terms to search the `values` (with the code 0) with the
+    `operator` 'in' or 'not in'.
+
+    Odoo takes 0 as False in such lists and tests for NULL instead (see
+    `PR 31408`__), so the code 0 is tested in a term of its own.
+
+    __ https://github.com/odoo/odoo/pull/31408
+
+    """
+    values = [value for value in values if not _is_zero_code(value)]
+    if operator == "in":
+        result = [(fieldname, "=", 0)]
+        if values:
+            result = ["|", (fieldname, "in", values)] + result
+    else:
+        # Like 'not in', match NULL unless False is in the values.
+        result = ["|", (fieldname, "!=", 0), (fieldname, "=", False)]
+        if values:
+            result = ["&", (fieldname, "not in", values)] + result
+    return result
+
+
+def _get_enumeration_field(model, path):
+    """Return the Enumeration field at the end of `path` in `model`.
+
+    Return None if `path` doesn't end in an Enumeration field.
+
+    """
+    if not isinstance(path, str):
+        return None
+    *fnames, fname = path.split(".")
+    if not fnames and fname not in model._enumeration_fnames:
+        return None
+    for name in fnames:
+        field = model._fields.get(name, None)
+        if field is None or not field.relational:
+            return None
+        model = model.env[field.comodel_name]
+    field = model._fields.get(fname, None)
+    return field if isinstance(field, Enumeration) else None
+
+
+def _get_search_value(field, value):
+    # Names (or codes) are kept, since a search (with converted values) may
+    # reach the model of the field again through a dotted path.
+    if value is None or value is False:
+        return value
+    if field._is_member_value(value):
+        return field._get_member_db_value(field.get_member_by_value(value))
+    if field.storage == "int":
+        if _is_code(value) and value in field._members_by_code:
+            return value
+    elif isinstance(value, str) and value in field.Enumclass.__members__:
+        return value
+    raise ValueError("Invalid member %r of enumeration %r" % (value, field.Enumclass))
+
+
 def _get_db_value(field, value):
     if value is None or value is False:  # and not field.required
         return value
     if isinstance(field, Enumeration):
         member = field.get_member_by_value(value)
-        return member.name
+        return field._get_member_db_value(member)
     else:
         return value
 
@@ -453,6 +672,23 @@ def _get_member_by_value(enumclass, value):
         raise ValueError("Invalid member %r of enumeration %r" % (value, enumclass))
 
 
+def _get_members_index(enumclass):
+    """Return a dict from the values of the enumclass's members to the members.
+
+    Return None if any value is unhashable.  When several members have the
+    same value, the index keeps the first one (as `_get_member_by_value`:func:
+    does).
+
+    """
+    result = {}
+    for name, value in enumclass.__members__.items():
+        try:
+            result.setdefault(value, Member(name, value))
+        except TypeError:
+            return None
+    return result
+
+
 def _get_member_by_name(enumclass, name):
     """Find the enumclass's member by name"""
     try:
@@ -461,6 +697,113 @@ def _get_member_by_name(enumclass, name):
         raise ValueError("Invalid key %r of enumeration %r" % (name, enumclass))
 
 
+def get_enumeration_codes(enumclass, codes=None):
+    """Return a dict from the names of the members of `enumclass` to codes.
+
+    The codes are the integers stored in the DB by the Enumeration fields
+    with ``storage='int'``.  They must be stable: changing them requires to
+    migrate the data.
+
+    The code of a member with an integer value is the value itself.  The
+    other members must have a code in `codes` (a mapping from names to
+    codes).  Members with different values must have different codes, and
+    all the codes must fit in a SMALLINT.
+
+    .. versionadded:: 2.9.0
+
+    """
+    codes = codes or {}
+    members = enumclass.__members__
+    result = {}
+    for name, value in members.items():
+        if _is_code(value):
+            code = codes.get(name, value)
+            if code != value:
+                raise ValueError(
+                    "The code of %r in %r must be its value" % (name, enumclass)
+                )
+        elif name in codes:
+            code = codes[name]
+        else:
+            raise ValueError("Missing the code of %r in %r" % (name, enumclass))
+        if not _is_code(code) or not MIN_CODE <= code <= MAX_CODE:
+            raise ValueError("Invalid code %r of %r in %r" % (code, name, enumclass))
+        result[name] = int(code)
+    names = {}
+    for name, code in result.items():
+        other = names.setdefault(code, name)
+        if members[other] != members[name]:
+            raise ValueError(
+                "Members %r and %r of %r have the same code" % (other, name, enumclass)
+            )
+    return result
+
+
+def convert_enumeration_column(cr, table, column, codes, storage="int"):
+    """Convert the column of an Enumeration field to another `storage`.
+
+    The `codes` are a mapping from the names of the members to their codes
+    (see `get_enumeration_codes`:func:).  Use this in a pre-migration script
+    of the addon changing the `storage` of the field: otherwise Odoo would
+    rename the existing column and create a new empty one.
+
+    Return True if the column was converted, and False if the column doesn't
+    exist or it's already in the given `storage`.  Raise a ValueError if the
+    column has values not in `codes`.
+
+    .. versionadded:: 2.9.0
+
+    """
+    from odoo.tools import sql
+
+    if storage not in STORAGES:
+        raise ValueError("Invalid storage %r" % storage)
+    column_info = sql.table_columns(cr, table).get(column)
+    if not column_info:
+        return False
+    if storage == "int":
+        if column_info["udt_name"] == "int2":
+            return False
+        pairs = list(codes.items())
+        known = tuple(codes) or (None,)
+        column_type = "int2"
+    else:
+        if column_info["udt_name"] == "varchar":
+            return False
+        names = {}
+        for name, code in codes.items():
+            names.setdefault(code, name)
+        pairs = [(code, name) for code, name in names.items()]
+        known = tuple(names) or (None,)
+        column_type = "varchar"
+    cr.execute(
+        'SELECT DISTINCT "{column}" FROM "{table}" '
+        'WHERE "{column}" IS NOT NULL AND "{column}" NOT IN %s'.format(
+            table=table, column=column
+        ),
+        [known],
+    )
+    unknown = [row[0] for row in cr.fetchall()]
+    if unknown:
+        raise ValueError(
+            "Unknown values %r in column %s of %s" % (unknown, column, table)
+        )
+    if pairs:
+        using = 'CASE "{column}" {whens} END'.format(
+            column=column, whens=" ".join(["WHEN %s THEN %s"] * len(pairs))
+        )
+    else:
+        using = "NULL"
+    cr.execute(
+        'ALTER TABLE "{table}" ALTER COLUMN "{column}" '
+        "TYPE {column_type} USING ({using})".format(
+            table=table, column=column, column_type=column_type, using=using
+        ),
+        [value for pair in pairs for value in pair],
+    )
+    return True
+
+
 def constant(value):
     "Create a function (of many args) that always returns a constant `value`."
 
@@ -7,7 +7,7 @@
 # This is free software; you can do what the LICENCE file allows you to.
 #
 from odoo import api, fields, models, _
-from xoeuf.osv.expression import Domain, FALSE_LEAF
+from xoeuf.osv.expression import DomainBuilder, OR_OPERATOR
 from xoeuf.models import iter_descendant_models
 
 
@@ -155,13 +155,13 @@ def _make_inverse_method(reference_field, field_name):
 def _make_search_method(reference_field, field_name):
     @api.multi
     def _search(self, operator, value):
-        domain = Domain([FALSE_LEAF])
+        builder = DomainBuilder(OR_OPERATOR)
         for model in get_mixin_descendants(
             self.pool, self._fields[reference_field].mixin
         ):
             for r in self.env[model].search([(field_name, operator, value)]):
-                domain |= [(reference_field, "=", r.reference_repr)]
-        return domain
+                builder.add([(reference_field, "=", r.reference_repr)])
+        return builder.build()
 
     return _search
 
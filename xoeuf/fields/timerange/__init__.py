@@ -6,6 +6,7 @@
 #
 # This is free software; you can do what the LICENCE file allows you to.
 #
+from bisect import bisect_left
 from pytz import timezone
 from datetime import datetime, time
 from functools import partial
@@ -24,13 +25,39 @@ class TimeField(_TimeRangeObject):
 
 
 class TimeRangeSelector(object):
+    """Find the first of the ranges in `choices` containing a time.
+
+    The ranges may overlap.  The boundaries of all the ranges split the day
+    in points and the open intervals between them; the range of each piece
+    is computed beforehand, so `get_range`:meth: is a binary search.
+
+    """
+
     def __init__(self, choices=()):
         self.ranges = [TimeField(c[2], c[3], c[0]) for c in choices]
+        self._points = sorted(
+            {r.start for r in self.ranges} | {r.end for r in self.ranges}
+        )
+        # The range of each point and of the interval before each point.
+        self._point_ranges = [self._find_range(p, p) for p in self._points]
+        self._interval_ranges = [None] + [
+            self._find_range(start, end)
+            for start, end in zip(self._points, self._points[1:])
+        ]
+
+    def _find_range(self, start, end):
+        return next((r for r in self.ranges if r.start <= start and end <= r.end), None)
 
     def get_range(self, _time=time.min):
         if isinstance(_time, datetime):
             _time = _time.time()
-        return next((_range for _range in self.ranges if _time in _range), None)
+        index = bisect_left(self._points, _time)
+        if index == len(self._points):
+            return None
+        elif self._points[index] == _time:
+            return self._point_ranges[index]
+        else:
+            return self._interval_ranges[index]
 
 
 # TODO: This is not actually a Selection.  In a selection the user is allowed
@@ -64,7 +91,12 @@ class TimeRange(Selection):
 
     type = "timerange"  # Q: Do we need to change the type?
 
-    _slots = {"time_field": None, "readonly": True, "tzone_field": None}
+    _slots = {
+        "time_field": None,
+        "readonly": True,
+        "tzone_field": None,
+        "_selectors": None,
+    }
 
     def __init__(
         self, time_field, tzone_field=None, selection=DEFAULT, *args, **kwargs
@@ -157,11 +189,28 @@ class TimeRange(Selection):
             selection = selection(env[self.model_name])
         return [value for value, _, _, _ in selection]
 
+    def _get_selector(self, env):
+        """Return the `TimeRangeSelector`:class: of the selection in `env`.
+
+        The selectors are kept per language and selection.
+
+        """
+        selection = self._description_selection(env)
+        key = (env.lang, tuple(tuple(choice) for choice in selection))
+        if self._selectors is None:
+            self._selectors = {}
+        result = self._selectors.get(key)
+        if result is None:
+            if len(self._selectors) >= SELECTORS_SIZE:
+                self._selectors.clear()
+            result = self._selectors[key] = TimeRangeSelector(selection)
+        return result
+
     def _compute(self, records):
         time_field = self.time_field
         tzone_field = self.tzone_field or ""
-        env = records.env
         field = records._fields[time_field]
+        selector = self._get_selector(records.env)
         for item in records:
             t_value = getattr(item, time_field)
             if isinstance(field, Datetime):
@@ -170,11 +219,15 @@ class TimeRange(Selection):
                 _time = t_value_localized.time()
             if isinstance(field, Float):
                 _time = get_time_from_float(t_value)
-            setattr(item, self.name, self._compute_selection(_time, env))
+            _range = selector.get_range(_time)
+            setattr(item, self.name, _range.name if _range else False)
 
     def _compute_selection(self, time_value, env):
-        selections = self._description_selection(env)
-        _range = TimeRangeSelector(selections).get_range(time_value)
+        _range = self._get_selector(env).get_range(time_value)
         if _range:
             return _range.name
         return False
+
+
+# The maximum number of selectors kept per field.
+SELECTORS_SIZE = 16
@@ -7,9 +7,10 @@
 # This is free software; you can do what the LICENCE file allows you to.
 #
 from collections import defaultdict
+from collections.abc import Iterator, Mapping, Set
 from inspect import getmembers
 
-from odoo import api, models, tools
+from odoo import SUPERUSER_ID, api, models, tools
 from xoeuf.osv.expression import Domain
 from xoeuf.modules import get_caller_addon
 
@@ -76,6 +77,8 @@ def _setup_base(self, *args, **kwargs):
     res = super_setup_base(self, *args, **kwargs)
     if do_setup:
         cls._method_triggers = tools.Collector()
+        cls._onupdate_fnames = frozenset()
+        cls._onupdate_inverses = {}
     return res
 
 
@@ -140,15 +143,64 @@ def setup_triggers(self):
 
     Abstract models do not add triggers, these are not instantiated directly.
 
+    .. versionchanged:: 2.9.0 Keep the names of the fields with triggers in
+       ``_onupdate_fnames``.
+
+    .. versionchanged:: 2.9.0 Keep the inverse of each path when all its
+       fields have an inverse field.  See `_get_inverse_path`:func:.
+
     """
     if not self._abstract:
         for update_method in self._onupdate_methods:
             for model, field, path in self.resolve_deps(update_method):
                 path_str = None if path is None else (".".join(path) or "id")
                 model._method_triggers.add(field, (update_method, self._name, path_str))
+                type(model)._onupdate_fnames |= {field.name}
+                if path:
+                    self._onupdate_inverses[path_str] = _get_inverse_path(self, path)
 
 
 models.BaseModel.setup_triggers = setup_triggers
+models.BaseModel._onupdate_fnames = frozenset()
+
+
+def _get_inverse_path(model, path):
+    """Return the inverse of `path` (a list of field names) in `model`.
+
+    The result is a pair ``(model_name, fnames)``: following the fields
+    `fnames` from some records of `model_name` reaches exactly the records
+    of `model` that reach them by `path`.
+
+    Return None if any field in `path` lacks an inverse.
+
+    """
+    inverses = []
+    for fname in path:
+        field = model._fields[fname]
+        comodel = model.env[field.comodel_name]
+        inverse = _get_inverse_field(model, field, comodel)
+        if inverse is None:
+            return None
+        inverses.append(inverse.name)
+        model = comodel
+    return model._name, ".".join(reversed(inverses))
+
+
+def _get_inverse_field(model, field, comodel):
+    # Fields with a domain don't reach all the records, so they can't be
+    # inverted.
+    if field.type not in ("many2one", "one2many", "many2many") or field.domain:
+        return None
+    if not field.store and field.type == "many2one":
+        return None
+    for inverse in model._field_inverses[field]:
+        if (
+            inverse.model_name == comodel._name
+            and inverse.comodel_name == model._name
+            and not inverse.domain
+        ):
+            return inverse
+    return None
 
 
 # add :meth:`odoo.models.BaseModel.update_onupdate`
@@ -161,36 +213,146 @@ def execute_onupdate(self, fnames):
 
     .. versionchanged:: 0.48.0 Ignore unknown fields.
 
+    .. versionchanged:: 2.9.0 While the recomputation is delayed (see
+       ``env.norecompute()``) the updater methods are delayed as well.
+       They are executed by `recompute()`, once per method with all the
+       records modified since then.  With ``recompute=False`` in the context
+       nobody calls `recompute()` afterwards, so the methods are executed
+       right away.
+
     """
+    # This is called for every create and write, most of them don't touch
+    # any field with triggers.
+    onupdate_fnames = self._onupdate_fnames
+    if isinstance(fnames, (Set, Mapping)):
+        if onupdate_fnames.isdisjoint(fnames):
+            return
+    else:
+        if not onupdate_fnames:
+            return
+        if isinstance(fnames, Iterator):
+            fnames = list(fnames)
+        if onupdate_fnames.isdisjoint(fnames):
+            return
     # group triggers by (model, path) to minimize the calls to search()
     triggers = defaultdict(set)
-    # Take only the fields that are in the model. This is necessary because in
-    # some rare cases this method is called with fields that may not be in the
-    # model. (e.g. xopgi_object_merger).
-    for fname in set(fnames) & set(self._fields):
+    # Take only the fields with triggers (and thus in the model). This is
+    # necessary because in some rare cases this method is called with fields
+    # that may not be in the model. (e.g. xopgi_object_merger).
+    for fname in onupdate_fnames.intersection(fnames):
         mfield = self._fields[fname]
         # group triggers by model and path to reduce the number of search()
         for method, model_name, path in self._method_triggers[mfield]:
             triggers[(model_name, method)].add(path)
-    # process triggers, mark fields to be invalidated/recomputed
+    if not triggers:
+        return
+    if self.env.recompute or not self._context.get("recompute", True):
+        todo = {}
+        _add_onupdate_todo(todo, self, triggers)
+        _run_onupdate_todo(todo)
+    else:
+        todo = self.env.all.__dict__.setdefault("onupdate_todo", {})
+        _add_onupdate_todo(todo, self, triggers)
+
+
+models.BaseModel.execute_onupdate = execute_onupdate
+
+
+def _add_onupdate_todo(todo, records, triggers):
+    """Add the ids of `records` to the paths of the `triggers` in `todo`.
+
+    The `todo` maps each environment to a dict from ``(model_name, method)``
+    to a dict from each path to the set of ids the path must reach.
+
+    """
+    pending = todo.setdefault(records.env, {})
     for model_method, paths in triggers.items():
-        model_name, method = model_method
-        # process stored fields
-        if paths:
-            # determine records of model_name linked by any of paths to self
-            if any(path == "id" for path in paths):
-                target = self
-            else:
-                env = self.sudo().with_context({"active_test": False}).env
-                target = env[model_name].search(
-                    Domain.OR(*([(path, "in", self.ids)] for path in paths))
+        targets = pending.setdefault(model_method, {})
+        for path in paths:
+            targets.setdefault(path, set()).update(records.ids)
+
+
+def _pop_onupdate_todo(env):
+    return env.all.__dict__.pop("onupdate_todo", None)
+
+
+def _run_onupdate_todo(todo, check_exists=False):
+    """Execute the updater methods in `todo`.
+
+    Each method is called once with all its target records.  The targets
+    are found following the inverse of the paths in memory (see
+    `_get_inverse_path`:func:).  The paths without inverse are searched,
+    once for all the methods with the same paths.
+
+    If `check_exists` is True, ignore the modified records that no longer
+    exist.
+
+    """
+    for env, pending in todo.items():
+        sudo_env = env(user=SUPERUSER_ID, context={"active_test": False})
+        searches = {}
+        for (model_name, method), paths in pending.items():
+            # determine records of model_name linked by any of paths to the
+            # modified records
+            target = env[model_name].browse(sorted(paths.pop("id", ())))
+            if check_exists:
+                target = target.exists()
+            inverses = env[model_name]._onupdate_inverses
+            for path in [path for path in paths if inverses.get(path)]:
+                source, inverse_path = inverses[path]
+                records = sudo_env[source].browse(sorted(paths.pop(path)))
+                if check_exists:
+                    records = records.exists()
+                target |= records.mapped(inverse_path).with_env(env)
+            if paths:
+                key = (
+                    model_name,
+                    frozenset((p, frozenset(i)) for p, i in paths.items()),
                 )
-                target = target.with_env(self.env)
-            # prepare recomputation for each field on linked records
+                linked = searches.get(key)
+                if linked is None:
+                    linked = searches[key] = sudo_env[model_name].search(
+                        Domain.OR(
+                            *(
+                                [(path, "in", sorted(ids))]
+                                for path, ids in paths.items()
+                            )
+                        )
+                    )
+                target |= linked.with_env(env)
             method(target)
 
 
-models.BaseModel.execute_onupdate = execute_onupdate
+# extend :meth:`odoo.models.BaseModel.recompute`
+super_recompute = models.BaseModel.recompute
+
+
+@api.model
+def recompute(self):
+    res = super_recompute(self)
+    # The updater methods may modify other records (and trigger other
+    # updater methods) while the recomputation is delayed.
+    todo = _pop_onupdate_todo(self.env)
+    while todo:
+        _run_onupdate_todo(todo, check_exists=True)
+        super_recompute(self)
+        todo = _pop_onupdate_todo(self.env)
+    return res
+
+
+models.BaseModel.recompute = recompute
+
+
+# extend :meth:`odoo.api.Environment.clear`
+super_clear = api.Environment.clear
+
+
+def _clear(self):
+    super_clear(self)
+    _pop_onupdate_todo(self)
+
+
+api.Environment.clear = _clear
 
 
 # extend :meth:`odoo.models.BaseModel._validate_fields`
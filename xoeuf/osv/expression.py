@@ -27,6 +27,10 @@ Additions and changes:
 
 """
 import operator
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache, wraps
 from itertools import chain
 
 from xotl.tools.deprecation import deprecated
@@ -58,6 +62,15 @@ BINARY_OPERATORS = [this.AND_OPERATOR, this.OR_OPERATOR]
 KIND_OPERATOR = "OPERATOR"
 KIND_TERM = "TERM"
 
+# The maximum number of compiled filters kept by `Domain.asfilter`.
+FILTER_CACHE_SIZE = 512
+
+# The maximum number of canonical trees kept for domains.
+TREE_CACHE_SIZE = 1024
+
+# The maximum number of SQL conditions kept by `Domain.to_sql`.
+SQL_CACHE_SIZE = 512
+
 
 # Exports normalize_leaf so that we can replace 'from odoo.
 def normalize_leaf(term):
@@ -107,18 +120,57 @@ class Domain(list):
         - ``not B.implies(A) == (A | B).implies(A)``
 
         """
-        other = DomainTree(Domain(other).second_normal_form)
-        return DomainTree(self.second_normal_form).implies(other)
+        return self._get_tree().implies(Domain(other)._get_tree())
+
+    def is_unsatisfiable(self, model=None):
+        """Check if no record can ever match the domain.
+
+        Like `implies`:meth:, this can have false negatives but not false
+        positives: if the result is True, the domain matches no record.
+
+        Besides `FALSE` and terms like ``(x, 'in', [])``, we look for
+        contradictions among the terms over the same field in an AND, e.g
+        ``[('a', '=', 1), ('a', '=', 2)]``, ``[('a', '>', 5), ('a', '<',
+        3)]`` or ``[('a', '=', False), ('a', '>', 0)]``.  Traversals (e.g.
+        ``line_ids.state``) are never considered contradictory.
+
+        :param model: The model the domain is for.  If given, only the terms
+            over stored single-valued fields with values of the right type
+            are compared (e.g. two terms ``(x2many, '=', id)`` are not
+            contradictory).  Otherwise, all the fields are taken as
+            single-valued, and the values as plain values.
+
+        .. versionadded:: 2.9.0
+
+        """
+        return _is_unsatisfiable(
+            _TermTree.parse(self.second_normal_form), _get_kinds_of_fields(model)
+        )
+
+    def is_tautology(self, model=None):
+        """Check if every record matches the domain.
+
+        This is the dual of `is_unsatisfiable`:meth:.  Besides `TRUE` and
+        terms like ``(x, 'not in', [])``, we look for terms over the same
+        field in an OR which cover all values (including NULL), e.g
+        ``['|', '|', ('a', '=', 1), ('a', '!=', 1), ('a', '=', False)]``.
+
+        .. versionadded:: 2.9.0
+
+        """
+        return _is_tautology(
+            _TermTree.parse(self.second_normal_form), _get_kinds_of_fields(model)
+        )
 
     @classproperty
     def TRUE(cls):
         "The domain which is True.  Implemented as ``[(1, '=', 1)]``."
-        return cls(this.TRUE_LEAF)
+        return cls([this.TRUE_LEAF])
 
     @classproperty
     def FALSE(cls):
         "The domain which is False.  Implemented as ``[(0, '=', 1)]``."
-        return cls(this.TRUE_LEAF)
+        return cls([this.FALSE_LEAF])
 
     @property
     def first_normal_form(self):
@@ -198,9 +250,12 @@ class Domain(list):
             ]
 
         """
-        res = self.first_normal_form
-        res = Domain((normalize_leaf(item) for item in res))
-        return res.distribute_not()
+        result = getattr(self, "_second_normal_form", None)
+        if result is None:
+            res = self.first_normal_form
+            res = Domain((normalize_leaf(item) for item in res))
+            result = self._second_normal_form = tuple(res.distribute_not())
+        return Domain(result)
 
     @property
     def simplified(self):
@@ -253,8 +308,13 @@ class Domain(list):
             >>> domain3.simplified
             ['&', ('field_x', 'in', (1,)), ('field_y', '!=', False)]
 
+        .. versionchanged:: 2.9.0 Terms over the same field may be merged into
+           a single term.  For instance, ``(x, '=', 1) | (x, '=', 2)`` becomes
+           ``(x, 'in', (1, 2))``, and ``(x, '>', 1) & (x, '>', 5)`` becomes
+           ``(x, '>', 5)``.
+
         """
-        return DomainTree(self.second_normal_form).get_simplified_domain()
+        return self._get_tree().get_simplified_domain()
 
     def distribute_not(self):
         """Return a new domain without `not` operators.
@@ -288,9 +348,11 @@ class Domain(list):
 
         :return: A domain if first normal form.
 
+        .. seealso:: `DomainBuilder`:class: to join many domains.
+
         """
-        return Domain(
-            this.AND([Domain(domain).second_normal_form for domain in domains])
+        return Domain._from_normal_form(
+            this.AND([_get_second_normal_form(domain) for domain in domains])
         )
 
     __and__ = __rand__ = AND
@@ -301,9 +363,11 @@ class Domain(list):
 
         :return: A domain if first normal form.
 
+        .. seealso:: `DomainBuilder`:class: to join many domains.
+
         """
-        return Domain(
-            this.OR([Domain(domain).second_normal_form for domain in domains])
+        return Domain._from_normal_form(
+            this.OR([_get_second_normal_form(domain) for domain in domains])
         )
 
     __or__ = __ror__ = OR
@@ -325,7 +389,40 @@ class Domain(list):
         return not self == other
 
     def __hash__(self):
-        return hash(DomainTree(self.second_normal_form))
+        return hash(self._get_tree())
+
+    def _get_tree(self):
+        """Return the canonical `DomainTree`:class: of the domain.
+
+        The tree is computed once and kept until the domain is modified.
+        Domains with the same second normal form share the same tree.
+
+        """
+        tree = getattr(self, "_tree", None)
+        if tree is None:
+            key = tuple(_get_typed_term(term) for term in self.second_normal_form)
+            try:
+                tree = _get_canonical_tree(key)
+            except TypeError:
+                # Unhashable values in terms.
+                tree = DomainTree(list(self.second_normal_form))
+            self._tree = tree
+        return tree
+
+    @classmethod
+    def _from_normal_form(cls, terms):
+        """Return the domain with `terms`, which are in second normal form."""
+        result = cls(terms)
+        result._second_normal_form = tuple(result)
+        return result
+
+    def _invalidate(self):
+        self._tree = self._second_normal_form = None
+
+    def __getstate__(self):
+        # Don't pickle the cached normal form and tree; hashes are not stable
+        # across processes.
+        return {}
 
     def asfilter(self, this="this", *, convert_false=True, convert_none=False):
         """Return a callable which is equivalent to the domain.
@@ -384,6 +481,17 @@ class Domain(list):
           lambda t: (t.mapped('order_id.line_ids')
                       .filtered(lambda r: r.state == 'open'))
 
+        Several terms of an AND (or an OR) over the same path share the
+        traversal: the lambda for::
+
+          Domain(['|', ('line_ids.state', '=', 'open'),
+                       ('line_ids.qty', '>', 0)]).asfilter()
+
+        is equivalent to::
+
+          lambda this: any(x.state == 'open' or x.qty > 0
+                           for x in this.mapped('line_ids'))
+
         .. versionadded:: 0.54.0
 
         .. versionchanged:: 0.55.0 Change the behavior of fields traversal, so
@@ -391,48 +499,228 @@ class Domain(list):
 
         .. versionchanged:: 0.82.0 Add parameters `convert_false` and `convert_none`.
 
+        .. versionchanged:: 2.9.0 The compiled lambdas are kept in a LRU cache
+           (see `get_filter_cache_info`:func:), so equivalent domains
+           (i.e. with the same second normal form) share the same lambda.
+
+           Also, the values in the domain are no longer embedded in the code
+           of the lambda.  The code is compiled once for all the domains with
+           the same *shape*, e.g ``[('partner_id', '=', 42)]`` and
+           ``[('partner_id', '=', 7)]``, and the values are bound to it.
+
+        .. versionchanged:: 2.9.0 Terms over the same path are compiled to a
+           single traversal.
+
         """
-        return eval(
-            compile(
-                self._get_filter_ast(
-                    this, convert_false=convert_false, convert_none=convert_none
-                ),
-                "<domain>",
-                "eval",
+        key = self._get_filter_key()
+        if key is not None:
+            return _compile_filter(key, this, convert_false, convert_none)
+        else:
+            return self._compile_filter(
+                this, convert_false=convert_false, convert_none=convert_none
             )
+
+    def _compile_filter(self, this="this", *, convert_false=True, convert_none=False):
+        shape, values = self._get_filter_shape()
+        factory = _compile_filter_factory(shape, this, convert_false, convert_none)
+        return factory(*values)
+
+    def _get_filter_shape(self):
+        """Return the shape of the domain and the values it takes.
+
+        The shape is the second normal form with the values replaced by
+        placeholders.  Only False and None are kept, because they change the
+        code of the filter (see `convert_false` and `convert_none` in
+        `asfilter`:meth:).  The values of 'in' and 'not in' are stripped from
+        False (and 0) here, instead of doing it in the code of the filter.
+
+        """
+        shape, values = [], []
+        for term in self.second_normal_form:
+            # Odoo recognizes the TRUE_LEAF and FALSE_LEAF by their values.
+            if this.is_leaf(term) and term not in (this.TRUE_LEAF, this.FALSE_LEAF):
+                left, op, value = term
+                if op in ("in", "not in") and isinstance(value, (list, tuple)):
+                    # See the note about 0 and False in `asfilter`.
+                    value = tuple(x for x in value if x != False)  # noqa
+                if value is not False and value is not None:
+                    values.append(value)
+                    value = _Placeholder(len(values) - 1)
+                term = (left, op, value)
+            shape.append(term)
+        return tuple(shape), values
+
+    def _get_filter_key(self):
+        """Return the key of the domain in the cache of filters.
+
+        The key is the second normal form with the type of each value in its
+        term, so that terms like ``(x, '=', 0)`` and ``(x, '=', False)``
+        don't collide.  Return None if the key is not hashable.
+
+        """
+        key = tuple(
+            (term[0], term[1], type(term[2]), term[2]) if this.is_leaf(term) else term
+            for term in self.second_normal_form
         )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        else:
+            return key
 
     def _get_filter_ast(self, this="this", *, convert_false=True, convert_none=False):
         """Get compilable AST of the lambda obtained by `get_filter`:func:."""
-        stack = []
-        for kind, term in self.walk():
-            if kind == KIND_TERM:
-                fieldname, op, value = term
-                constructor = _TERM_CONSTRUCTOR[op]
-                stack.append(
-                    constructor(
-                        this,
-                        fieldname,
-                        value,
-                        convert_false=convert_false,
-                        convert_none=convert_none,
-                    )
-                )
-            else:
-                assert kind == KIND_OPERATOR
-                if term in BINARY_OPERATORS:
-                    args = (stack.pop(), stack.pop())
-                else:
-                    args = (stack.pop(),)
-                constructor = _TERM_CONSTRUCTOR[term]
-                stack.append(constructor(*args))
-        node = stack.pop()
-        assert not stack, "Remaining nodes in the stack: {}".format(stack)
+        node = _get_filter_body(
+            self.second_normal_form,
+            this,
+            convert_false=convert_false,
+            convert_none=convert_none,
+        )
         fn = ql.ensure_compilable(
             ql.Expression(ql.Lambda(ql.make_arguments(this), node))
         )
         return fn
 
+    def filter_records(self, records, *, convert_false=True, convert_none=False):
+        """Return the records in `records` which satisfy the domain.
+
+        The result is the same as ``records.filtered(self.asfilter())``, but
+        the domain is evaluated term by term over the whole recordset,
+        combining the ids matched by each term.  Each term is evaluated only
+        over the records which may still change the result: terms of an AND
+        only over the records matched by the previous terms; terms of an OR
+        only over the records not matched yet.  Thus the values of each field
+        are fetched once for all the records.
+
+        Fields traversals (e.g ``('line_ids.state', '=', 'open')``) are
+        evaluated one level at a time: the term ``('state', '=', 'open')`` is
+        evaluated over all the lines of all the records, and then a record
+        matches if any of its lines does.
+
+        The order of `records` is preserved.
+
+        :keyword convert_false: The same as in `asfilter`:meth:.
+
+        :keyword convert_none: The same as in `asfilter`:meth:.
+
+        .. versionadded:: 2.9.0
+
+        """
+        tree = _get_evaluation_tree(self.second_normal_form)
+        ids = _filter_ids(
+            tree, records, convert_false=convert_false, convert_none=convert_none
+        )
+        return records.browse([id for id in records._ids if id in ids])
+
+    def to_sql(self, model, alias=None):
+        """Return the SQL condition of the domain over `model`.
+
+        The result is the triple ``(where_clause, params, joins)``.  The
+        `where_clause` must be executed with `params`; `joins` is the list of
+        tables (with their aliases) the domain needs in the FROM clause,
+        besides the table of `model`.  For instance::
+
+            where, params, joins = Domain([('state', '=', 'done')]).to_sql(
+                self.env['sale.order'], alias='so'
+            )
+            self.env.cr.execute(
+                '''SELECT so.partner_id, SUM(so.amount_total)
+                   FROM sale_order so {joins}
+                   WHERE {where}
+                   GROUP BY so.partner_id
+                '''.format(where=where, joins="".join(", " + j for j in joins)),
+                params,
+            )
+
+        The SQL is obtained from Odoo's `expression` without going through
+        ``search()``: the record rules are not applied, there's no implicit
+        ``('active', '=', True)``, and the signals connected to ``search()``
+        are not sent.
+
+        :param alias: The alias of the table of `model` in the query.  If
+            None, the table is referred by its name.  If the domain needs a
+            sub-query, the condition is ``alias.id IN (SELECT ...)`` and no
+            joins are returned.
+
+        The SQL is kept in a cache by the *shape* of the domain when all its
+        terms compare stored fields of `model` whose values reach the SQL
+        unchanged (integers, many2one, text, selection and unsized char)
+        with plain values (numbers and strings; not False, None or 0).  Other
+        domains are translated each time, because Odoo may query the database
+        or change the SQL depending on the values.  See
+        `clear_sql_cache`:func:.
+
+        .. versionadded:: 2.9.0
+
+        """
+        shape, values = self._get_sql_shape(model)
+        if shape is None:
+            return self._get_sql(model, alias, plain=False)
+        key = (model.pool.db_name, model._name, alias, shape)
+        cached = _get_cached_sql(key, model)
+        if cached is not None:
+            where, joins = cached
+            return where, values, list(joins)
+        where, params, joins = self._get_sql(model, alias, plain=True)
+        # Only cache the SQL if the params are exactly the values in the
+        # domain, otherwise Odoo has transformed them.
+        if len(params) == len(values) and all(
+            param is value for param, value in zip(params, values)
+        ):
+            _set_cached_sql(key, model, (where, tuple(joins)))
+        return where, params, joins
+
+    def _get_sql(self, model, alias, *, plain):
+        query = this.expression(list(self.second_normal_form), model)
+        where, params = query.to_sql()
+        table = '"%s"' % model._table
+        tables = query.get_tables()
+        joins = [t for t in tables if t != table]
+        if alias is not None and alias != model._table:
+            if plain:
+                # The table is only used to qualify the columns, and there
+                # are no values in the SQL.
+                where = where.replace(table + ".", '"%s".' % alias)
+            else:
+                where = '"{alias}"."id" IN (SELECT {table}."id" FROM {tables} WHERE {where})'.format(  # noqa
+                    alias=alias, table=table, tables=", ".join(tables), where=where
+                )
+                joins = []
+        return where, params, joins
+
+    def _get_sql_shape(self, model):
+        """Return the shape of the domain in the cache of `to_sql`:meth:.
+
+        The shape is the second normal form with the values replaced by their
+        types.  Return ``(None, None)`` if the SQL of the domain may depend
+        on something else than its shape.
+
+        """
+        shape, values = [], []
+        for term in self.second_normal_form:
+            if this.is_leaf(term) and term not in (this.TRUE_LEAF, this.FALSE_LEAF):
+                left, op, value = term
+                if op not in _SQL_OPERATORS or not _is_plain_column(
+                    model._fields.get(left)
+                ):
+                    return None, None
+                if op in ("in", "not in"):
+                    if not isinstance(value, tuple) or not all(
+                        _is_sql_value(x) for x in value
+                    ):
+                        return None, None
+                    values.extend(value)
+                    value = tuple(type(x) for x in value)
+                elif _is_sql_value(value):
+                    values.append(value)
+                    value = type(value)
+                else:
+                    return None, None
+                term = (left, op, value)
+            shape.append(term)
+        return tuple(shape), values
+
     def walk(self):
         """Performs a post-fix walk of the domain's second normal form.
 
@@ -464,6 +752,115 @@ class Domain(list):
                 yield "OPERATOR", term
 
 
+def _invalidating(method):
+    @wraps(method)
+    def result(self, *args, **kwargs):
+        self._invalidate()
+        return method(self, *args, **kwargs)
+
+    return result
+
+
+# Modifying the domain drops the cached normal form and tree.
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(Domain, _name, _invalidating(getattr(list, _name)))
+del _name
+
+
+class DomainBuilder(object):
+    """Build a domain joining many domains with the same operator.
+
+    This is the same as joining the domains with `Domain.AND`:meth: (or
+    `Domain.OR`:meth:) but each domain is normalized once, when it's added,
+    and the result is built once at the end::
+
+        >>> builder = DomainBuilder(OR_OPERATOR)
+        >>> for partner in partners:
+        ...     builder.add([('partner_id', '=', partner.id)])
+        >>> builder.build()
+        [('partner_id', 'in', (1, 2, 3))]
+
+    Under OR, terms ``(x, '=', a)`` and ``(x, 'in', [b, c])`` are collapsed
+    into a single term ``(x, 'in', (a, b, c))``.  Likewise, under AND terms
+    ``(x, '!=', a)`` and ``(x, 'not in', [b, c])`` are collapsed into ``(x,
+    'not in', (a, b, c))``, except for traversals (see
+    `Domain.simplified`:attr:).
+
+    :param operator: Either `AND_OPERATOR` (the default) or `OR_OPERATOR`.
+
+    .. versionadded:: 2.9.0
+
+    """
+
+    def __init__(self, operator=this.AND_OPERATOR):
+        if operator not in BINARY_OPERATORS:
+            raise ValueError("Invalid operator %r" % (operator,))
+        self.operator = operator
+        # The operands are either a tuple of terms (in second normal form) or
+        # a dict with the values collected for a field (mapped to the term
+        # they come from).
+        self._operands = []
+        self._values = {}
+
+    def add(self, domain):
+        """Join `domain` to the result.  Return the builder."""
+        if len(domain) == 1 and this.is_leaf(domain[0]):
+            terms = (normalize_leaf(domain[0]),)
+        else:
+            terms = tuple(_get_second_normal_form(domain))
+        key = None
+        if len(terms) == 1 and this.is_leaf(terms[0]):
+            key = _get_merge_key(self.operator, DomainTerm(terms[0]))
+        # Terms without values (e.g ``(x, 'in', [])``) are kept as they are,
+        # there would be no term to build the merged term from.
+        if key is not None and key[1] in ("in", "not in") and terms[0][2] != ():
+            values = self._values.get(key)
+            if values is None:
+                self._values[key] = values = {}
+                self._operands.append(values)
+            for value in _as_tuple(terms[0][2]):
+                values.setdefault(value, terms[0])
+        else:
+            self._operands.append(terms)
+        return self
+
+    def build(self):
+        """Return the `Domain`:class: joining all the domains added."""
+        if self.operator == this.AND_OPERATOR:
+            combine, merged_operator = this.AND, "not in"
+        else:
+            combine, merged_operator = this.OR, "in"
+        operands = []
+        for operand in self._operands:
+            if isinstance(operand, dict):
+                terms = set(operand.values())
+                if len(terms) == 1:
+                    # Keep the only term as it was added.
+                    operands.append(list(terms))
+                else:
+                    left = next(iter(terms))[0]
+                    operands.append([(left, merged_operator, tuple(operand))])
+            else:
+                operands.append(list(operand))
+        return Domain._from_normal_form(combine(operands))
+
+    def __len__(self):
+        return len(self._operands)
+
+
 class DomainTerm(object):
     def __init__(self, term):
         if isinstance(term, DomainTerm):
@@ -521,8 +918,22 @@ class DomainTerm(object):
         "not ilike": lambda x, y: y.lower().find(x.lower()) >= 0,
     }
 
+    # Implications between terms with different operators.  We don't deal
+    # with False here, because it has special meanings for Odoo.
+    cross_operators_implication = {
+        ("=", "in"): lambda x, y: _is_plain_value(x) and x in _as_tuple(y),
+        ("in", "="): lambda x, y: _is_plain_value(y) and _as_tuple(x) == (y,),
+        ("not in", "!="): lambda x, y: _is_plain_value(y) and y in _as_tuple(x),
+        ("!=", "not in"): lambda x, y: _is_plain_value(x) and _as_tuple(y) == (x,),
+        (">", ">="): operator.ge,
+        (">=", ">"): operator.gt,
+        ("<", "<="): operator.le,
+        ("<=", "<"): operator.lt,
+    }
+
     def implies(self, other):
-        other = DomainTerm(other)
+        if not isinstance(other, DomainTerm):
+            other = DomainTerm(other)
         # equals terms are implied.
         if self == other:
             return True
@@ -541,7 +952,13 @@ class DomainTerm(object):
                 return compare(self.right, other.right) if compare else False
             else:
                 # TODO: x = 1  implies x != 2; x = 2 1 implies x > 1
-                return False
+                compare = self.cross_operators_implication.get(
+                    (self.operator, other.operator)
+                )
+                try:
+                    return compare(self.right, other.right) if compare else False
+                except TypeError:
+                    return False
 
     def __hash__(self):
         return hash(self.normalized)
@@ -585,12 +1002,17 @@ class DomainTree(object):
 
     .. warning:: The domain must be in the second normal form.
 
+    Trees are immutable.  The sub-trees are interned: equal sub-trees (with
+    the same terms, and values of the same types) are the same object.
+
+    .. versionchanged:: 2.9.0 The `parent` argument is ignored, since the
+       sub-trees are shared among trees.
+
     """
 
     def __init__(self, domain, parent=None):
         term = domain.pop(0)
         self.term = DomainTerm(term)
-        self.parent = parent
         if term in this.DOMAIN_OPERATORS:
             count = 2  # minimum number of operand in an operation.
             children = set()
@@ -599,7 +1021,7 @@ class DomainTree(object):
                     count += 1
                     domain.pop(0)
                 else:
-                    child = DomainTree(domain, self)
+                    child = _intern_tree(DomainTree(domain))
                     # A & ((B & C) | A) should be simplified as A & B & C
                     if child.term == self.term:
                         children |= child.children
@@ -612,51 +1034,107 @@ class DomainTree(object):
                 self.term = child.term
                 self.children = child.children
             else:
-                self.children = children
+                self.children = frozenset(children)
         else:
-            self.children = set()
+            self.children = frozenset()
         self._simplify()
 
     @property
     def is_operator(self):
-        return self.term in this.DOMAIN_OPERATORS
+        return self.term.is_operator
 
     @property
     def is_leaf(self):
         return not self.is_operator
 
     def _simplify(self):
-        """Remove redundant branches."""
-        for child in set(self.children):
-            if self.term == this.AND_OPERATOR:
+        """Remove redundant branches.
+
+        First, merge the leaves which can be expressed with a single term
+        (see `_merge_leaves`:func:).  Then remove the children implied by (or
+        implying) other children.  Since a child can only imply another if
+        both have terms about the same field, we only compare the children
+        that share some field.
+
+        """
+        if self.children:
+            if self.term.operator == this.AND_OPERATOR:
                 # If current `child` is implied by any other ignore it.
-                func = lambda x, y: y.implies(x)
+                func = lambda x, y: y.implies(x)  # noqa: E731
             else:
                 # If current `child` implies any other ignore it.
-                func = lambda x, y: x.implies(y)
-            if any(func(child, y) for y in self.children - {child}):
-                self.children.remove(child)
+                func = lambda x, y: x.implies(y)  # noqa: E731
+            children = _merge_leaves(self.term.original, self.children)
+            index = {}
+            for child in children:
+                for left in child.lefts:
+                    index.setdefault(left, []).append(child)
+            for child in list(children):
+                candidates = {y for left in child.lefts for y in index[left]}
+                candidates.discard(child)
+                if any(func(child, y) for y in candidates if y in children):
+                    children.remove(child)
+            self.children = frozenset(children)
         if len(self.children) == 1:
-            _self = self.children.pop()
+            (_self,) = self.children
             self.children = _self.children
             self.term = _self.term
+        self._lefts = self._sorted_children = self._hash = self._key = None
+
+    @property
+    def key(self):
+        """The key of the tree in the table of interned trees.
+
+        Unlike the hash of the tree, the key takes into account the type of
+        the values in terms, so that ``(x, '=', 0)`` and ``(x, '=', False)``
+        are not confused.
+
+        """
+        if self._key is None:
+            if self.is_leaf:
+                self._key = _get_typed_term(self.term.normalized)
+            else:
+                self._key = (
+                    self.term.operator,
+                    frozenset(child.key for child in self.children),
+                )
+        return self._key
+
+    @property
+    def lefts(self):
+        """The set of fields (left operands) in the terms of the tree."""
+        if self._lefts is None:
+            if self.is_leaf:
+                self._lefts = frozenset([self.term.left])
+            else:
+                self._lefts = frozenset(
+                    left for child in self.children for left in child.lefts
+                )
+        return self._lefts
 
     @property
     def sorted_children(self):
         # TODO: Sort by hash is weird.  What does it mean?
-        return sorted(self.children, key=lambda item: hash(item))
+        if self._sorted_children is None:
+            self._sorted_children = sorted(self.children, key=lambda item: hash(item))
+        return self._sorted_children
 
-    def get_simplified_domain(self):
-        if self.parent:
+    def get_simplified_domain(self, root=True):
+        if not root:
             res = Domain(self.term.original for x in range(1, len(self.children) or 2))
         elif self.is_leaf:
             res = Domain([self.term.original])
         else:
             # Initials `&` aren't needed.
-            res = Domain([self.term.original] if self.term == this.OR_OPERATOR else [])
+            if self.term.operator == this.OR_OPERATOR:
+                res = Domain([self.term.original] * (len(self.children) - 1))
+            else:
+                res = Domain()
         if not self.is_leaf:
             res.extend(
-                chain(*(x.get_simplified_domain() for x in self.sorted_children))
+                chain(
+                    *(x.get_simplified_domain(root=False) for x in self.sorted_children)
+                )
             )
         return res
 
@@ -682,7 +1160,7 @@ class DomainTree(object):
         return not self == other
 
     def implies(self, other):
-        funct = all if other.term == this.AND_OPERATOR else any
+        funct = all if other.term.operator == this.AND_OPERATOR else any
         if self.is_leaf:
             # A => A
             if self.term.implies(other.term):
@@ -693,7 +1171,7 @@ class DomainTree(object):
             ):
                 return True
         elif self.is_operator:
-            funct2 = any if self.term == this.AND_OPERATOR else all
+            funct2 = any if self.term.operator == this.AND_OPERATOR else all
             # A & B => A
             if funct2(child.implies(other) for child in self.sorted_children):
                 return True
@@ -706,7 +1184,9 @@ class DomainTree(object):
         return False
 
     def __hash__(self):
-        return hash(tuple([self.term] + self.sorted_children))
+        if self._hash is None:
+            self._hash = hash(tuple([self.term] + self.sorted_children))
+        return self._hash
 
     @deprecated("Domain.walk()")
     def walk(self):
@@ -753,6 +1233,471 @@ class DomainTree(object):
                     yield (KIND_OPERATOR, self.term)
 
 
+def _is_plain_value(value):
+    """Check if `value` can be moved in and out of 'in' and 'not in' lists.
+
+    Values equal to False (including 0) and None are treated specially by
+    Odoo in such lists; booleans and unhashable values are not plain either.
+
+    """
+    if isinstance(value, bool) or value is None:
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return value != False  # noqa
+
+
+def _as_tuple(value):
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+# Operators of the terms that are merged with `_merge_leaves` (per kind of
+# node).  The values are the names of the groups.
+_BOUNDS_OPERATORS = {">": "lower", ">=": "lower", "<": "upper", "<=": "upper"}
+_MERGEABLE_OPERATORS = {
+    this.OR_OPERATOR: dict(_BOUNDS_OPERATORS, **{"=": "in", "in": "in"}),
+    this.AND_OPERATOR: dict(_BOUNDS_OPERATORS, **{"!=": "not in", "not in": "not in"}),
+}
+
+
+def _get_merge_key(operator, term):
+    group = _MERGEABLE_OPERATORS[operator].get(term.operator)
+    if group is None:
+        return None
+    value = term.right
+    if group in ("lower", "upper"):
+        if isinstance(value, bool) or value is None:
+            return None
+    elif term.operator in ("in", "not in"):
+        if not isinstance(value, tuple):
+            return None
+        try:
+            hash(value)
+        except TypeError:
+            return None
+    elif not _is_plain_value(value):
+        return None
+    if group == "not in" and (not isinstance(term.left, str) or "." in term.left):
+        # For x2many fields ``('line_ids.x', '!=', 1)`` means there is a line
+        # such that its x is not 1.  Two of such terms in AND are not the
+        # same as one with 'not in'.
+        return None
+    return term.left, group
+
+
+def _merge_leaves(operator, children):
+    """Return the `children` of an `operator` node with some leaves merged.
+
+    Under OR: terms ``(x, '=', a)`` and ``(x, 'in', [b, c])`` are merged into
+    ``(x, 'in', (a, b, c))``.  Under AND: terms ``(x, '!=', a)`` and ``(x,
+    'not in', [b, c])`` are merged into ``(x, 'not in', (a, b, c))``, except
+    for traversals.  For comparisons (``<``, ``<=``, ``>``, ``>=``) we keep
+    only the tightest bound (under AND) or the loosest (under OR).
+
+    """
+    result = set()
+    groups = {}
+    for child in children:
+        key = _get_merge_key(operator, child.term) if child.is_leaf else None
+        if key is None:
+            result.add(child)
+        else:
+            groups.setdefault(key, []).append(child)
+    for (left, group), leaves in groups.items():
+        if len(leaves) == 1:
+            result.update(leaves)
+        elif group in ("in", "not in"):
+            result.add(_intern_tree(DomainTree([_merge_values(left, group, leaves)])))
+        else:
+            result.update(_merge_bounds(operator, group, leaves))
+    return result
+
+
+def _merge_values(left, operator, leaves):
+    values, seen = [], set()
+    for leaf in leaves:
+        for value in _as_tuple(leaf.term.right):
+            if value not in seen:
+                seen.add(value)
+                values.append(value)
+    try:
+        values.sort()
+    except TypeError:
+        values.sort(key=lambda value: (type(value).__name__, repr(value)))
+    return (left, operator, tuple(values))
+
+
+def _merge_bounds(operator, group, leaves):
+    if group == "lower":
+        # The greater the bound, the tighter; '>' is tighter than '>='.
+        def key(leaf):
+            return (leaf.term.right, leaf.term.operator == ">")
+
+        select = max if operator == this.AND_OPERATOR else min
+    else:
+        # The lesser the bound, the tighter; '<' is tighter than '<='.
+        def key(leaf):
+            return (leaf.term.right, leaf.term.operator == "<=")
+
+        select = min if operator == this.AND_OPERATOR else max
+    try:
+        return [select(leaves, key=key)]
+    except TypeError:
+        return leaves
+
+
+# The kinds of values (see `_get_value_kind`) we compare for each type of
+# field in `_is_unsatisfiable` and `_is_tautology`.
+_FIELD_KINDS = {
+    "char": {"str"},
+    "text": {"str"},
+    "html": {"str"},
+    "selection": {"str"},
+    "reference": {"str"},
+    "integer": {"number"},
+    "float": {"number"},
+    "monetary": {"number"},
+    "many2one": {"number"},
+    "date": {"date"},
+    "datetime": {"datetime"},
+}
+_ALL_KINDS = frozenset(chain(*_FIELD_KINDS.values()))
+
+
+def _get_kinds_of_fields(model):
+    """Return a function that gives the kinds of values for a field name.
+
+    The result is empty for the fields whose terms cannot be compared.
+
+    """
+
+    def get_kinds(fieldname):
+        if not isinstance(fieldname, str) or "." in fieldname:
+            return ()
+        elif model is None:
+            return _ALL_KINDS
+        field = model._fields.get(fieldname)
+        if field is None or not field.store or field.translate:
+            return ()
+        return _FIELD_KINDS.get(field.type, ())
+
+    return get_kinds
+
+
+def _get_value_kind(value):
+    if isinstance(value, bool):
+        return None
+    elif isinstance(value, (int, float)):
+        return "number"
+    elif isinstance(value, str):
+        return "str"
+    elif isinstance(value, datetime.datetime):
+        return "datetime"
+    elif isinstance(value, datetime.date):
+        return "date"
+    else:
+        return None
+
+
+class _TermTree(object):
+    """The terms of a domain in second normal form, as a tree.
+
+    Unlike `DomainTree`:class:, the terms are neither merged nor
+    simplified.  DomainTree compares terms by hash, so it takes ``(x, '=',
+    0)`` and ``(x, '=', False)`` (or ``(x, '=', -1)`` and ``(x, '=', -2)``)
+    as the same term; that's fine for `Domain.implies`:meth:, but we must
+    not lose any term when we look for contradictions.
+
+    """
+
+    __slots__ = ("term", "children", "is_leaf")
+
+    def __init__(self, term, children=()):
+        self.term = term
+        self.children = children
+        self.is_leaf = term.is_leaf
+
+    @classmethod
+    def parse(cls, terms):
+        return cls._parse(iter(terms))
+
+    @classmethod
+    def _parse(cls, terms):
+        term = next(terms)
+        if term not in (this.AND_OPERATOR, this.OR_OPERATOR):
+            return cls(DomainTerm(term))
+        children = []
+        for _ in range(2):
+            child = cls._parse(terms)
+            if not child.is_leaf and child.term.operator == term:
+                children.extend(child.children)
+            else:
+                children.append(child)
+        return cls(DomainTerm(term), children)
+
+
+def _is_unsatisfiable(tree, get_kinds, context=()):
+    """Check if no record satisfies the `tree`.
+
+    The `context` are the terms of the enclosing ANDs.  Thus, each
+    alternative of an OR is checked along with the terms it must hold with.
+
+    """
+    if tree.is_leaf:
+        term = tree.term
+        if term.normalized == this.FALSE_LEAF or (
+            term.operator == "in" and term.right == ()
+        ):
+            return True
+        return _is_contradiction(term.left, context + (term,), get_kinds)
+    elif tree.term.operator == this.OR_OPERATOR:
+        return all(
+            _is_unsatisfiable(child, get_kinds, context) for child in tree.children
+        )
+    else:
+        leaves = [child for child in tree.children if child.is_leaf]
+        terms = context + tuple(leaf.term for leaf in leaves)
+        return (
+            any(_is_unsatisfiable(leaf, get_kinds) for leaf in leaves)
+            or any(
+                _is_contradiction(left, terms, get_kinds)
+                for left in {leaf.term.left for leaf in leaves}
+            )
+            or any(
+                _is_unsatisfiable(child, get_kinds, terms)
+                for child in tree.children
+                if not child.is_leaf
+            )
+        )
+
+
+def _is_contradiction(left, terms, get_kinds):
+    """Check if the `terms` over the field `left` contradict each other."""
+    kinds = get_kinds(left)
+    if not kinds:
+        return False
+    terms = [term for term in terms if term.left == left]
+    return len(terms) > 1 and _are_contradictory(terms, kinds)
+
+
+def _is_tautology(tree, get_kinds):
+    if tree.is_leaf:
+        term = tree.term
+        return (
+            term.normalized == this.TRUE_LEAF
+            or (term.operator == "not in" and term.right == ())
+            or (term.operator == "=?" and (term.right is False or term.right is None))
+        )
+    elif tree.term.operator == this.AND_OPERATOR:
+        return all(_is_tautology(child, get_kinds) for child in tree.children)
+    elif any(_is_tautology(child, get_kinds) for child in tree.children):
+        return True
+    else:
+        groups = _group_leaves(tree.children, get_kinds)
+        return any(_are_exhaustive(terms, get_kinds(left)) for left, terms in groups)
+
+
+def _group_leaves(children, get_kinds):
+    """Return the terms of the leaves in `children` grouped by field.
+
+    Only fields with at least two terms, and whose terms can be compared
+    are returned.
+
+    """
+    groups = {}
+    for child in children:
+        if child.is_leaf and get_kinds(child.term.left):
+            groups.setdefault(child.term.left, []).append(child.term)
+    return [(left, terms) for left, terms in groups.items() if len(terms) > 1]
+
+
+def _get_term_values(term, kinds):
+    """Return the set of values of a term, or None if we can't compare them.
+
+    The values must be plain values (see `_is_plain_value`:func:) of the
+    same kind, and one of the `kinds`.
+
+    """
+    if term.operator in ("in", "not in"):
+        if not isinstance(term.right, tuple):
+            return None
+        values = term.right
+    else:
+        values = (term.right,)
+    if not all(_is_plain_value(value) for value in values):
+        return None
+    if not {_get_value_kind(value) for value in values} <= kinds:
+        return None
+    return set(values)
+
+
+def _are_contradictory(terms, kinds):
+    """Check if no value satisfies all the `terms` (over the same field)."""
+    allowed, excluded, lower, upper = None, set(), [], []
+    null = notnull = False
+    found = set()
+    for term in terms:
+        op, value = term.operator, term.right
+        if op in ("=", "!=") and value is False:
+            if op == "=":
+                null = True
+            else:
+                notnull = True
+            continue
+        if _excludes_null(term):
+            notnull = True
+        values = _get_term_values(term, kinds)
+        if values is None:
+            continue
+        found.update(_get_value_kind(value) for value in values)
+        if op in ("=", "in"):
+            allowed = values if allowed is None else allowed & values
+        elif op in ("!=", "not in"):
+            excluded |= values
+        elif op in _BOUNDS_OPERATORS and _get_value_kind(value) != "str":
+            # Strings are not compared, the collation of the DB may not
+            # be the same as Python's.
+            bounds = lower if _BOUNDS_OPERATORS[op] == "lower" else upper
+            bounds.append((op, value))
+    if null and notnull:
+        return True
+    if len(found) > 1:
+        # Values of several kinds, e.g. 1 and '1'; the DB may cast them.
+        return False
+    try:
+        if allowed is not None:
+            return not any(
+                _within_bounds(value, lower, upper) for value in allowed - excluded
+            )
+        else:
+            return _are_empty_bounds(lower, upper, excluded)
+    except TypeError:
+        return False
+
+
+def _excludes_null(term):
+    """Check if the `term` is False for NULL."""
+    op, value = term.operator, term.right
+    if op == "in":
+        # Odoo removes False (and 0) from the list and matches NULL instead.
+        return isinstance(value, tuple) and all(x != False for x in value)  # noqa
+    elif op == "=" or op in _BOUNDS_OPERATORS:
+        return value is not False and value is not None
+    else:
+        return False
+
+
+def _within_bounds(value, lower, upper):
+    return all(
+        value > bound if op == ">" else value >= bound for op, bound in lower
+    ) and all(value < bound if op == "<" else value <= bound for op, bound in upper)
+
+
+def _are_empty_bounds(lower, upper, excluded):
+    for low_op, low in lower:
+        for up_op, up in upper:
+            if low > up:
+                return True
+            elif low == up:
+                if low_op == ">" or up_op == "<" or low in excluded:
+                    return True
+    return False
+
+
+def _are_exhaustive(terms, kinds):
+    """Check if every value satisfies some of the `terms` (over the same field).
+
+    We don't assume the terms with '!=' and 'not in' are true for NULL, so
+    NULL must be covered by ``(x, '=', False)``.
+
+    """
+    allowed, excluded = set(), None
+    null = notnull = False
+    found = set()
+    for term in terms:
+        op, value = term.operator, term.right
+        if op in ("=", "!=") and value is False:
+            if op == "=":
+                null = True
+            else:
+                notnull = True
+            continue
+        if op not in ("=", "in", "!=", "not in"):
+            continue
+        values = _get_term_values(term, kinds)
+        if values is None:
+            continue
+        found.update(_get_value_kind(value) for value in values)
+        if op in ("=", "in"):
+            allowed |= values
+        else:
+            excluded = values if excluded is None else excluded & values
+    if null and notnull:
+        return True
+    if len(found) > 1:
+        return False
+    return null and excluded is not None and excluded <= allowed
+
+
+_INTERNED_TREES = weakref.WeakValueDictionary()
+
+
+def _intern_tree(tree):
+    """Return the interned tree equal to `tree`."""
+    key = tree.key
+    result = _INTERNED_TREES.get(key, None)
+    if result is None:
+        _INTERNED_TREES[key] = result = tree
+    return result
+
+
+@lru_cache(maxsize=TREE_CACHE_SIZE)
+def _get_canonical_tree(key):
+    return _intern_tree(DomainTree([_get_untyped_term(term) for term in key]))
+
+
+def _get_typed_term(term):
+    if this.is_leaf(term):
+        left, op, value = term
+        return (left, op, _get_typed_value(value))
+    else:
+        return term
+
+
+def _get_typed_value(value):
+    if type(value) is tuple:
+        return (tuple, tuple(_get_typed_value(x) for x in value))
+    else:
+        return (type(value), value)
+
+
+def _get_untyped_term(term):
+    if isinstance(term, str):
+        return term
+    else:
+        left, op, value = term
+        return (left, op, _get_untyped_value(value))
+
+
+def _get_untyped_value(value):
+    kind, value = value
+    if kind is tuple:
+        return tuple(_get_untyped_value(x) for x in value)
+    else:
+        return value
+
+
+def _get_second_normal_form(domain):
+    # Return a list: Odoo compares the domains given to its AND and OR with
+    # TRUE_DOMAIN and FALSE_DOMAIN, and comparing instances of Domain is
+    # expensive.
+    if not isinstance(domain, Domain):
+        domain = Domain(domain)
+    return list(domain.second_normal_form)
+
+
 # Exports AND and OR so that we can replace 'from odoo.
 def AND(domains):
     return Domain.AND(*domains)
@@ -762,6 +1707,368 @@ def OR(domains):
     return Domain.OR(*domains)
 
 
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _compile_filter(key, this, convert_false, convert_none):
+    domain = Domain(
+        term if isinstance(term, str) else (term[0], term[1], term[3]) for term in key
+    )
+    return domain._compile_filter(
+        this, convert_false=convert_false, convert_none=convert_none
+    )
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _compile_filter_factory(shape, argname, convert_false, convert_none):
+    """Compile the filter for a domain `shape`.
+
+    Return a function that takes the values of the placeholders in the
+    shape and returns the filter.  See `Domain._get_filter_shape`:meth:.
+
+    """
+    node = _get_filter_body(
+        shape, argname, convert_false=convert_false, convert_none=convert_none
+    )
+    # Placeholders are numbered in the order they appear in the shape.
+    params = [
+        term[2].name
+        for term in shape
+        if this.is_leaf(term) and isinstance(term[2], _Placeholder)
+    ]
+    fn = ql.ensure_compilable(
+        ql.Expression(
+            ql.Lambda(
+                ql.make_arguments(*params),
+                ql.Lambda(ql.make_arguments(argname), node),
+            )
+        )
+    )
+    return eval(compile(fn, "<domain>", "eval"))
+
+
+def _get_filter_body(domain, argname, *, convert_false, convert_none):
+    """Get the AST of the body of the filter of `domain` (in 2NF)."""
+    return _get_filter_node(
+        _get_evaluation_tree(domain),
+        argname,
+        convert_false=convert_false,
+        convert_none=convert_none,
+    )
+
+
+def _get_filter_node(node, argname, *, convert_false, convert_none):
+    """Get the AST of a node of the evaluation tree of a domain.
+
+    The terms of an AND or an OR that traverse the same path (e.g
+    ``line_ids.state`` and ``line_ids.qty``) are compiled to a single
+    traversal, see `_get_traversal_node`:func:.
+
+    """
+    if not isinstance(node, list):
+        fieldname, op, value = node
+        constructor = _TERM_CONSTRUCTOR[op]
+        return constructor(
+            argname,
+            fieldname,
+            value,
+            convert_false=convert_false,
+            convert_none=convert_none,
+        )
+    operator, children = node
+    groups = {}
+    for child in children:
+        if not isinstance(child, list) and _get_traversal_path(child[0]):
+            groups.setdefault(_get_traversal_path(child[0]), []).append(child)
+    operands, traversed = [], set()
+    for child in children:
+        path = None if isinstance(child, list) else _get_traversal_path(child[0])
+        group = groups.get(path) if path else None
+        if group is not None and len(group) > 1:
+            if path not in traversed:
+                traversed.add(path)
+                operands.append(
+                    _get_traversal_node(
+                        operator,
+                        path,
+                        group,
+                        argname,
+                        convert_false=convert_false,
+                        convert_none=convert_none,
+                    )
+                )
+        else:
+            operands.append(
+                _get_filter_node(
+                    child,
+                    argname,
+                    convert_false=convert_false,
+                    convert_none=convert_none,
+                )
+            )
+    if len(operands) == 1:
+        return operands[0]
+    return _TERM_CONSTRUCTOR[operator](*operands)
+
+
+def _get_traversal_path(fieldname):
+    """Return the path traversed by a term over `fieldname` (or None)."""
+    if isinstance(fieldname, str) and "." in fieldname:
+        return fieldname.rsplit(".", 1)[0]
+    else:
+        return None
+
+
+def _get_traversal_node(operator, path, terms, argname, *, convert_false, convert_none):
+    """Get the AST of several `terms` over the same `path` joined by `operator`.
+
+    A term ``(path.field, op, value)`` holds if any of the records in
+    ``this.mapped(path)`` satisfy ``(field, op, value)``.  So, for an OR the
+    result is equivalent to::
+
+        any(<term1> or <term2> ... for x in this.mapped(path))
+
+    For an AND each term may be satisfied by a different record, so the
+    records are only fetched once::
+
+        (lambda records: any(<term1> for x in records) and ...)(
+            this.mapped(path)
+        )
+
+    Both short-circuit on the first record that satisfies the terms, and
+    don't create the filtered recordsets.
+
+    """
+    predicates = [
+        _TERM_CONSTRUCTOR[op](
+            "x",
+            fieldname.rsplit(".", 1)[1],
+            value,
+            convert_false=convert_false,
+            convert_none=convert_none,
+        )
+        for fieldname, op, value in terms
+    ]
+    mapped = ql.make_call(
+        ql.make_attr(ql.Name(argname, ql.Load()), "mapped"),
+        _constructor_from_value(path),
+    )
+    if operator == this.OR_OPERATOR:
+        return _constructor_any(_constructor_or(*predicates), mapped)
+    else:
+        records = ql.Name("records", ql.Load())
+        return ql.make_call(
+            ql.Lambda(
+                ql.make_arguments("records"),
+                _constructor_and(
+                    *(_constructor_any(predicate, records) for predicate in predicates)
+                ),
+            ),
+            mapped,
+        )
+
+
+def _constructor_any(predicate, records):
+    # any(<predicate> for x in <records>)
+    return ql.make_call(
+        ql.Name("any", ql.Load()),
+        ql.GeneratorExp(
+            predicate, [ql.comprehension(ql.Name("x", ql.Store()), records, [])]
+        ),
+    )
+
+
+def _get_evaluation_tree(domain):
+    """Return the tree of `domain` (in 2NF) used by `Domain.filter_records`.
+
+    Each node is either a term or a pair ``(operator, children)``.  Nested
+    operators of the same kind are merged.
+
+    """
+    stack = []
+    for term in reversed(domain):
+        if this.is_leaf(term):
+            stack.append(term)
+        else:
+            children = []
+            for child in (stack.pop(), stack.pop()):
+                if isinstance(child, list) and child[0] == term:
+                    children.extend(child[1])
+                else:
+                    children.append(child)
+            stack.append([term, children])
+    node = stack.pop()
+    assert not stack, "Remaining nodes in the stack: {}".format(stack)
+    return node
+
+
+def _filter_ids(node, records, *, convert_false, convert_none):
+    """Return the set of ids of `records` matching the `node`."""
+    if not records:
+        return set()
+    elif isinstance(node, list):
+        operator, children = node
+        if operator == this.AND_OPERATOR:
+            candidates = records
+            for child in children:
+                ids = _filter_ids(
+                    child,
+                    candidates,
+                    convert_false=convert_false,
+                    convert_none=convert_none,
+                )
+                candidates = candidates.browse([i for i in candidates._ids if i in ids])
+                if not candidates:
+                    break
+            return set(candidates._ids)
+        else:
+            assert operator == this.OR_OPERATOR
+            result = set()
+            candidates = records
+            for child in children:
+                ids = _filter_ids(
+                    child,
+                    candidates,
+                    convert_false=convert_false,
+                    convert_none=convert_none,
+                )
+                result |= ids
+                candidates = candidates.browse(
+                    [i for i in candidates._ids if i not in ids]
+                )
+                if not candidates:
+                    break
+            return result
+    else:
+        fieldname, operator, value = node
+        if isinstance(fieldname, str) and "." in fieldname:
+            head, rest = fieldname.split(".", 1)
+            targets = _filter_ids(
+                (rest, operator, value),
+                records.mapped(head),
+                convert_false=convert_false,
+                convert_none=convert_none,
+            )
+            if not targets:
+                return set()
+            return {
+                record.id
+                for record in records
+                if not targets.isdisjoint(record[head]._ids)
+            }
+        else:
+            predicate = Domain([node]).asfilter(
+                convert_false=convert_false, convert_none=convert_none
+            )
+            return {record.id for record in records if predicate(record)}
+
+
+class _Placeholder(object):
+    """Stands for the value of a term in the shape of a domain."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, index):
+        self.name = "_arg%d" % index
+
+    def __repr__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return isinstance(other, _Placeholder) and self.name == other.name
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+def get_filter_cache_info():
+    """Return the statistics of the cache of `Domain.asfilter`:meth:.
+
+    The result is the named tuple ``(hits, misses, maxsize, currsize)`` of
+    `functools.lru_cache`:func:.
+
+    .. versionadded:: 2.9.0
+
+    """
+    return _compile_filter.cache_info()
+
+
+def clear_filter_cache():
+    """Clear the cache of `Domain.asfilter`:meth:.
+
+    .. versionadded:: 2.9.0
+
+    """
+    _compile_filter.cache_clear()
+
+
+# Operators of the terms whose SQL only depends on the field.
+_SQL_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+
+def _is_plain_column(field):
+    """Check if `field` is a column in the table of its model.
+
+    Only the types of fields which pass the values to the SQL unchanged are
+    accepted.  Other fields (e.g dates, floats with digits) transform the
+    values, and a sized Char truncates only the long strings, so the SQL
+    can't be reused with other values.
+
+    """
+    return (
+        field is not None
+        and field.store
+        and field.column_type
+        and not field.translate
+        and not field.inherited
+        and field.type in _PLAIN_COLUMN_TYPES
+        and not (field.type == "char" and field.size)
+    )
+
+
+_PLAIN_COLUMN_TYPES = ("integer", "many2one", "char", "text", "selection")
+
+
+def _is_sql_value(value):
+    return type(value) in (int, float, str) and _is_plain_value(value)
+
+
+_sql_cache = OrderedDict()
+_sql_cache_lock = threading.Lock()
+
+
+def _get_cached_sql(key, model):
+    with _sql_cache_lock:
+        entry = _sql_cache.get(key)
+        if entry is None:
+            return None
+        # The registry may have been reloaded since, with other fields.
+        model_class, result = entry
+        if model_class() is not type(model):
+            del _sql_cache[key]
+            return None
+        _sql_cache.move_to_end(key)
+        return result
+
+
+def _set_cached_sql(key, model, result):
+    with _sql_cache_lock:
+        _sql_cache[key] = (weakref.ref(type(model)), result)
+        while len(_sql_cache) > SQL_CACHE_SIZE:
+            _sql_cache.popitem(last=False)
+
+
+def clear_sql_cache():
+    """Clear the cache of `Domain.to_sql`:meth:.
+
+    .. versionadded:: 2.9.0
+
+    """
+    with _sql_cache_lock:
+        _sql_cache.clear()
+
+
 def _constructor_not(node):
     return ql.UnaryOp(ql.Not(), node)
 
@@ -912,7 +2219,8 @@ def _constructor_in(
     # Filtering False is the same Odoo does; which causes 0 to be removed
     # also.  See https://github.com/odoo/odoo/pull/31408
     assert qst in (ql.In, ql.NotIn)
-    value = [x for x in value if x != False]  # noqa
+    if not isinstance(value, _Placeholder):
+        value = [x for x in value if x != False]  # noqa
     return _get_constructor(qst)(
         this, fieldname, value, convert_false=convert_false, convert_none=convert_none
     )
@@ -1030,6 +2338,8 @@ def _constructor_not_ilike(
 
 
 def _constructor_from_value(value):
+    if isinstance(value, _Placeholder):
+        return ql.Name(value.name, ql.Load())
     expr = ql.parse(repr(value))
     return expr.body
 
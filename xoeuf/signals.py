@@ -10,23 +10,40 @@
 # This is the implementation of the signals.  The 'signals' module remains the
 # API but we're porting this to 'odoo.signals'.
 import logging
-from functools import wraps
+import math
+from collections import OrderedDict, deque
+from functools import partial, wraps
 from threading import RLock
-
-from expiringdict import ExpiringDict
+from time import perf_counter
 
 from odoo import api, models
 
 from xotl.tools.objects import temp_attributes
-from xotl.tools.symbols import Unset
 from xotl.tools.future.contextlib import ExitStack, contextmanager
 
+from xoeuf.osv.expression import Domain
+
 
 logger = logging.getLogger(__name__)
 del logging
 
 _lock = RLock()
-_cache = ExpiringDict(max_len=100, max_age_seconds=10)
+
+# The name of the attribute where we keep the index of installed addons in
+# each registry.
+_INSTALLED_MODULES_INDEX = "__xoeuf_installed_modules"
+
+# The name of the attribute where we keep the calls to deferred hooks in each
+# cursor.
+_DEFERRED_QUEUE = "__xoeuf_deferred_hooks"
+
+# The maximum number of threads running the background part of wrappers.
+BACKGROUND_WRAPPERS_MAX_WORKERS = 4
+_background_executor = None
+
+# The statistics of the calls to hooks; see `enable_stats`.
+_stats_enabled = False
+_stats = {}
 
 
 class HookDefinition(object):
@@ -35,10 +52,35 @@ class HookDefinition(object):
         self.action = action
         self.__doc__ = doc
 
+    @property
+    def hooks(self):
+        return self._hooks
+
+    @hooks.setter
+    def hooks(self, value):
+        # `_no_signalling` replaces the hooks temporarily; the dispatch tables
+        # must not outlive the hooks they were computed from.
+        self._hooks = value
+        self._reset_dispatch_tables()
+
+    def _reset_dispatch_tables(self):
+        # Maps the set of installed addons to a table from model names to the
+        # tuple of live hooks for that model.
+        self._dispatch_tables = {}
+
     def __repr__(self):
         return "<Signal(%r)>" % self.action
 
-    def connect(self, hook, sender=None, require_registry=True, framework=False):
+    def connect(
+        self,
+        hook,
+        sender=None,
+        require_registry=True,
+        framework=False,
+        fields=None,
+        deferred=False,
+        background=False,
+    ):
         """Connect hook.
 
         :param hook: A function or an instance method which is to receive
@@ -55,11 +97,30 @@ class HookDefinition(object):
         :keyword framework: Set to True to make this a `framework-level hook
                             <FrameworkHook>`:class:.
 
+        :keyword fields: The names of the fields the hook cares about.  If
+                 given, the hook is only called when the signal's `values`
+                 touch any of those fields.  For signals sent with a list of
+                 `values` (e.g. ``create``) the hook receives only the values
+                 (and `result` records) that touch them.  Signals without
+                 `values` always call the hook.
+
+        :keyword deferred: If True, the hook is not called while sending the
+                 signal but after the transaction is committed (see
+                 `flush_deferred`:func:).
+
+        :keyword background: Only for wrappers.  See `wrapper`:func:.
+
         :return: receiver
 
+        .. versionchanged:: 2.9.0 Added the `fields`, `deferred` and
+           `background` keyword arguments.
+
         """
         if not isinstance(sender, (list, tuple)):
             sender = [sender]
+        if isinstance(fields, str):
+            fields = [fields]
+        fields = frozenset(fields) if fields else None
         HookClass = Hook if not framework else FrameworkHook
         for s in sender:
             lookup_key = (_make_id(hook), _make_model_id(s))
@@ -67,9 +128,17 @@ class HookDefinition(object):
                 self.hooks.append(
                     (
                         lookup_key,
-                        HookClass(hook, sender=s, require_registry=require_registry),
+                        HookClass(
+                            hook,
+                            sender=s,
+                            require_registry=require_registry,
+                            fields=fields,
+                            deferred=deferred,
+                            background=background,
+                        ),
                     )
                 )
+        self._reset_dispatch_tables()
         return hook
 
     def disconnect(self, hook=None, sender=None):
@@ -83,6 +152,7 @@ class HookDefinition(object):
         key = (_make_id(hook), _make_model_id(sender)), hook
         if key in self.hooks:
             self.hooks.remove(key)
+            self._reset_dispatch_tables()
 
     def has_listeners(self, sender=None):
         return bool(self.live_hooks(sender))
@@ -93,7 +163,44 @@ class HookDefinition(object):
         Live hook are defined as those that are installed in the DB and apply
         to the given sender.  Framework-level hooks are always live.
 
+        Return a tuple of hooks.  When the `sender` is a model with a ready
+        registry, the live hooks are computed once per model (and set of
+        installed addons) and kept until a hook is connected or disconnected.
+
+        .. versionchanged:: 2.9.0 Return a tuple instead of a list.
+
         """
+        if isinstance(sender, models.BaseModel) and sender.pool.ready:
+            table = self._get_dispatch_table(sender.env)
+            try:
+                return table[sender._name]
+            except KeyError:
+                result = table[sender._name] = self._find_live_hooks(sender)
+                return result
+        else:
+            return self._find_live_hooks(sender)
+
+    def _get_dispatch_table(self, env):
+        # The set of installed addons is shared by all the envs of the same
+        # registry (see `get_installed_modules`), and it's replaced when the
+        # state of any module changes or the registry is reloaded.  So using
+        # it as the key drops the tables computed for the previous state.
+        installed = get_installed_modules(env)
+        tables = self._dispatch_tables
+        table = tables.get(installed)
+        if table is None:
+            with _lock:
+                table = tables.get(installed)
+                if table is None:
+                    table = {}
+                    # We only need the table of the current state.  Other
+                    # registries (DBs) will build theirs if needed.
+                    if len(tables) > 16:
+                        tables.clear()
+                    tables[installed] = table
+        return table
+
+    def _find_live_hooks(self, sender):
         if isinstance(sender, models.Model):
             registry_ready = sender.pool.ready
         else:
@@ -111,7 +218,7 @@ class HookDefinition(object):
                         ),
                     )
                     result.append(hook)
-        return result
+        return tuple(result)
 
 
 class Signal(HookDefinition):
@@ -138,7 +245,12 @@ class Signal(HookDefinition):
         if not self.hooks:
             return responses
         for hook in self.live_hooks(sender):
-            response = hook(sender, self, **kwargs)
+            hook_kwargs = _select_for_hook(hook, kwargs)
+            if hook_kwargs is None:
+                continue
+            if hook.deferred and _defer(hook, sender, self, hook_kwargs):
+                continue
+            response = _call_hook(hook, sender, self, hook_kwargs)
             responses.append((hook, response))
         return responses
 
@@ -170,8 +282,13 @@ class Signal(HookDefinition):
         if not self.hooks:
             return responses
         for hook in self.live_hooks(sender):
+            hook_kwargs = _select_for_hook(hook, kwargs)
+            if hook_kwargs is None:
+                continue
+            if hook.deferred and _defer(hook, sender, self, hook_kwargs):
+                continue
             try:
-                response = hook(sender, self, **kwargs)
+                response = _call_hook(hook, sender, self, hook_kwargs)
             except SoftTimeLimitExceeded:
                 raise
             except catched as err:
@@ -192,6 +309,9 @@ class Wrapping(HookDefinition):
         livewrappers = self.live_hooks(sender)
         wrappers = []
         for wrapper in livewrappers:
+            if wrapper.fields and args and isinstance(args[0], dict):
+                if wrapper.fields.isdisjoint(args[0]):
+                    continue
             try:
                 w = wrapper(sender, self, *args, **kwargs)
                 try:
@@ -199,31 +319,88 @@ class Wrapping(HookDefinition):
                 except StopIteration:
                     logger.error("Wrapper %s failed to yield once", wrapper)
                 else:
-                    wrappers.append(w)
+                    wrappers.append((wrapper, w))
             except Exception:
                 logger.exception("Unexpected error in wrapper")
         result = method(sender, *args, **kwargs)
-        for wrapper in wrappers:
-            try:
-                wrapper.send(dict(result=result))
-                logger.error("Wrapper %s failed to yield only once")
-            except StopIteration:
-                pass
-            except Exception:
-                logger.exception("Unexpected error in wrapper")
+        for wrapper, w in wrappers:
+            if wrapper.background and isinstance(sender, models.BaseModel):
+                _resume_in_background(wrapper, w, sender, result)
+            else:
+                _resume_wrapper(wrapper, w, dict(result=result))
         return result
 
 
+def _resume_wrapper(wrapper, generator, data):
+    try:
+        generator.send(data)
+        logger.error("Wrapper %s failed to yield only once", wrapper)
+    except StopIteration:
+        pass
+    except Exception:
+        logger.exception("Unexpected error in wrapper")
+
+
+def _get_background_executor():
+    global _background_executor
+    if _background_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with _lock:
+            if _background_executor is None:
+                _background_executor = ThreadPoolExecutor(
+                    max_workers=BACKGROUND_WRAPPERS_MAX_WORKERS,
+                    thread_name_prefix="xoeuf-wrappers",
+                )
+    return _background_executor
+
+
+def _resume_in_background(wrapper, generator, sender, result):
+    """Resume the `generator` of a background `wrapper` after commit.
+
+    The rest of the wrapper runs in a thread of a bounded pool, with its own
+    cursor.  Since the original cursor may be closed by then, the wrapper
+    receives the `sender` bound to the new cursor.
+
+    """
+    registry, uid, context = sender.pool, sender.env.uid, sender.env.context
+    model, ids = sender._name, sender._ids
+
+    def _resume():
+        with api.Environment.manage(), registry.cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            data = dict(result=result, sender=env[model].browse(ids))
+            _resume_wrapper(wrapper, generator, data)
+
+    def _submit():
+        _get_background_executor().submit(_resume)
+
+    cr = sender.env.cr
+    cr.after("commit", _submit)
+    cr.after("rollback", generator.close)
+
+
 class Hook(object):
     """Wraps a hook function, so that we can store some metadata."""
 
     def __init__(self, func, **kwargs):
         from xotl.tools.objects import smart_copy
 
+        from xoeuf.modules import get_object_module
+
         hash(func)  # Fail if func is not hashable
         self.func = func
+        self.module = get_object_module(func, typed=True)
         smart_copy(
-            kwargs, self.__dict__, defaults={"require_registry": True, "sender": None}
+            kwargs,
+            self.__dict__,
+            defaults={
+                "require_registry": True,
+                "sender": None,
+                "fields": None,
+                "deferred": False,
+                "background": False,
+            },
         )
 
     def __repr__(self):
@@ -252,7 +429,10 @@ class Hook(object):
         framework.)
 
         """
-        return is_installed(sender, self.func)
+        env = getattr(sender, "env", None)
+        if not self.module or not env:
+            return True
+        return self.module in get_installed_modules(env)
 
 
 class FrameworkHook(Hook):
@@ -279,6 +459,12 @@ def receiver(signal, **kwargs):
     :keyword framework: Set to True to make this a `framework-level receiver
                         <FrameworkHook>`:class:.
 
+    :keyword fields: The names of the fields the receiver cares about.  See
+             `HookDefinition.connect`:meth:.
+
+    :keyword deferred: If True, the receiver is called after the transaction
+             is committed.  See `flush_deferred`:func:.
+
     Used by passing in the signal (or list of signals) and keyword arguments
     to connect::
 
@@ -293,6 +479,14 @@ def receiver(signal, **kwargs):
     .. versionchanged:: 0.56.0 `signal` is not required to be a list or tuple,
                         but any type of iterable (`iter`:func:).
 
+    .. versionchanged:: 2.9.0 Added the `fields` keyword argument::
+
+        @receiver(post_create, sender='my.model', fields=['state'])
+        def state_receiver(sender, signal, result=None, values=None, **kw):
+            # `values` contains only the dicts that set 'state', and
+            # `result` only the records created from them.
+            ...
+
     """
 
     def _decorator(func):
@@ -318,6 +512,19 @@ def wrapper(wrapping, **kwargs):
     :keyword framework: Set to True to make this a `framework-level wrapper
                         <FrameworkHookData>`:class:.
 
+    :keyword fields: The names of the fields the wrapper cares about.  The
+             wrapper is skipped if the values being written don't touch any
+             of them.
+
+    :keyword background: If True, the code after the ``yield`` is regarded
+             as side-effect free (e.g. auditing or exporting metrics).  It
+             runs after the transaction commits, in a thread pool of
+             `BACKGROUND_WRAPPERS_MAX_WORKERS` threads, each task with its
+             own cursor.  The ``yield`` returns a dict with the `result` and
+             the `sender` bound to the new cursor; use that `sender` instead
+             of the original one.  If the transaction is rolled back, the
+             code after the ``yield`` doesn't run.
+
     Example::
 
         @wrapper(write_wrapper, sender='my.model')
@@ -331,6 +538,9 @@ def wrapper(wrapping, **kwargs):
     Standard wrappers wrap the pre/post signals.  So wrappers may be affected
     by the effects in post signals.
 
+    .. versionchanged:: 2.9.0 Added the `fields` and `background` keyword
+       arguments.
+
     """
     return receiver(wrapping, **kwargs)
 
@@ -415,6 +625,187 @@ def mock_replace(hook, func, **replacement_attrs):
     return _hidden_patcher()
 
 
+class HookStats(object):
+    """The statistics of the calls to a hook for a given signal and model.
+
+    The latency percentiles are computed from the last `SAMPLES` calls.
+
+    .. versionadded:: 2.9.0
+
+    """
+
+    SAMPLES = 1024
+
+    __slots__ = ("hook", "signal", "model", "count", "total_time", "queries", "samples")
+
+    def __init__(self, hook, signal, model):
+        self.hook = hook
+        self.signal = signal
+        self.model = model
+        self.count = 0
+        self.total_time = 0.0
+        self.queries = 0
+        self.samples = deque(maxlen=self.SAMPLES)
+
+    def __repr__(self):
+        return "<HookStats for %s in %s(%s): %d calls, %.6fs>" % (
+            self.name,
+            self.signal,
+            self.model,
+            self.count,
+            self.total_time,
+        )
+
+    @property
+    def name(self):
+        """The qualified name of the function of the hook."""
+        func = self.hook.func
+        qualname = getattr(func, "__qualname__", None)
+        if qualname:
+            return "%s.%s" % (getattr(func, "__module__", "?"), qualname)
+        else:
+            return repr(func)
+
+    @property
+    def p50(self):
+        return self.percentile(0.5)
+
+    @property
+    def p99(self):
+        return self.percentile(0.99)
+
+    def percentile(self, p):
+        """Return the latency (in seconds) of the `p` percentile (0 < p <= 1)."""
+        samples = sorted(self.samples)
+        if samples:
+            return samples[max(0, math.ceil(p * len(samples)) - 1)]
+        else:
+            return 0.0
+
+    def add(self, elapsed, queries):
+        self.count += 1
+        self.total_time += elapsed
+        self.queries += queries
+        self.samples.append(elapsed)
+
+
+def enable_stats():
+    """Start collecting statistics of the calls to hooks.
+
+    While disabled (the default), the only overhead is checking a global
+    flag before calling each hook.  Deferred hooks are measured as well, but
+    wrappers are not.
+
+    See `get_stats`:func: and `format_stats`:func:.
+
+    .. versionadded:: 2.9.0
+
+    """
+    global _stats_enabled
+    _stats_enabled = True
+
+
+def disable_stats():
+    """Stop collecting statistics.  The collected ones are kept.
+
+    .. versionadded:: 2.9.0
+
+    """
+    global _stats_enabled
+    _stats_enabled = False
+
+
+def reset_stats():
+    """Discard the collected statistics.
+
+    .. versionadded:: 2.9.0
+
+    """
+    with _lock:
+        _stats.clear()
+
+
+def get_stats():
+    """Return the list of `HookStats`:class: collected in this process.
+
+    The list is sorted by the total time spent in the hooks (the slowest
+    first).
+
+    .. versionadded:: 2.9.0
+
+    """
+    with _lock:
+        result = list(_stats.values())
+    result.sort(key=lambda stat: stat.total_time, reverse=True)
+    return result
+
+
+def format_stats():
+    """Return the collected statistics in the Prometheus text format.
+
+    .. versionadded:: 2.9.0
+
+    """
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def labels(stat, **extra):
+        result = dict(hook=stat.name, signal=stat.signal, model=stat.model, **extra)
+        return ",".join('%s="%s"' % (k, escape(v)) for k, v in result.items())
+
+    stats = get_stats()
+    lines = [
+        "# HELP xoeuf_signal_hook_seconds Latency of the calls to signal hooks.",
+        "# TYPE xoeuf_signal_hook_seconds summary",
+    ]
+    for stat in stats:
+        for quantile in (0.5, 0.99):
+            lines.append(
+                "xoeuf_signal_hook_seconds{%s} %.9f"
+                % (labels(stat, quantile=quantile), stat.percentile(quantile))
+            )
+        lines.append(
+            "xoeuf_signal_hook_seconds_sum{%s} %.9f" % (labels(stat), stat.total_time)
+        )
+        lines.append(
+            "xoeuf_signal_hook_seconds_count{%s} %d" % (labels(stat), stat.count)
+        )
+    lines.extend(
+        [
+            "# HELP xoeuf_signal_hook_queries_total "
+            "SQL queries issued by signal hooks.",
+            "# TYPE xoeuf_signal_hook_queries_total counter",
+        ]
+    )
+    for stat in stats:
+        lines.append(
+            "xoeuf_signal_hook_queries_total{%s} %d" % (labels(stat), stat.queries)
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _call_hook(hook, sender, signal, kwargs):
+    if not _stats_enabled:
+        return hook(sender, signal, **kwargs)
+    env = getattr(sender, "env", None)
+    cr = getattr(env, "cr", None)
+    queries = getattr(cr, "sql_log_count", 0)
+    start = perf_counter()
+    try:
+        return hook(sender, signal, **kwargs)
+    finally:
+        elapsed = perf_counter() - start
+        queries = getattr(cr, "sql_log_count", 0) - queries
+        model = sender._name if isinstance(sender, models.BaseModel) else ""
+        key = (hook, signal.action, model)
+        with _lock:
+            stat = _stats.get(key)
+            if stat is None:
+                stat = _stats[key] = HookStats(hook, signal.action, model)
+            stat.add(elapsed, queries)
+
+
 def is_installed(self, func):
     """Check whether `func` is installed in the DB of `self`.
 
@@ -429,17 +820,175 @@ def is_installed(self, func):
     env = getattr(self, "env", None)
     if not module or not env:
         return True
-    dbname = env.cr.dbname
+    return module in get_installed_modules(env)
+
+
+def get_installed_modules(env):
+    """Return the names of the addons installed in the DB of `env`.
+
+    The result is a `frozenset`:class: which is computed once per registry
+    and shared by all the threads using that registry.
+
+    The index is tied to the registry's signaling sequence.  When an addon is
+    installed or upgraded Odoo loads a new registry (in other workers this
+    happens when they notice the sequence has changed), so the index is built
+    again.  Changing the state of a module within the current registry drops
+    the index as well (see `invalidate_installed_modules`:func:).
+
+    While the registry is not ready (i.e. it's loading the addons) the index
+    is not kept, because the states of the modules are still changing.
+
+    .. versionadded:: 2.9.0
+
+    """
+    registry = env.registry
+    sequence = getattr(registry, "registry_sequence", None)
+    index = getattr(registry, _INSTALLED_MODULES_INDEX, None)
+    if index is not None and index[0] == sequence:
+        return index[1]
     with _lock:
-        result = _cache.get((dbname, module), Unset)
-        if result is not Unset:
-            return result
-    Module = env["ir.module.module"].sudo()
-    query = [("state", "=", "installed"), ("name", "=", module)]
-    with _no_signalling(pre_search), _no_signalling(post_search):
-        result = bool(Module.search(query, limit=1))
+        index = getattr(registry, _INSTALLED_MODULES_INDEX, None)
+        if index is not None and index[0] == sequence:
+            return index[1]
+        # Don't use the ORM: we would be dispatching 'pre_search' and
+        # 'post_search' while computing the hooks of those signals.
+        env.cr.execute("SELECT name FROM ir_module_module WHERE state = 'installed'")
+        result = frozenset(name for name, in env.cr.fetchall())
+        if registry.ready:
+            setattr(registry, _INSTALLED_MODULES_INDEX, (sequence, result))
+    return result
+
+
+def invalidate_installed_modules(registry):
+    """Drop the index of installed addons kept in `registry`.
+
+    The index is rebuilt the next time `get_installed_modules`:func: is called
+    for that registry.
+
+    .. versionadded:: 2.9.0
+
+    """
     with _lock:
-        _cache[module] = result
+        if hasattr(registry, _INSTALLED_MODULES_INDEX):
+            delattr(registry, _INSTALLED_MODULES_INDEX)
+
+
+def flush_deferred(cr):
+    """Call the deferred hooks queued in the cursor `cr`.
+
+    Hooks connected with ``deferred=True`` are not called when the signal is
+    sent.  Instead, the call is queued in the cursor of the sender and
+    coalesced by hook, model and record ids: if the same hook is to be called
+    several times for the same records within a transaction, it's called
+    once, with the `values` merged.  Searches and calls without records are
+    not coalesced.
+
+    The queue is flushed after the cursor commits, and discarded if the
+    cursor rolls back.  Since the transaction which sent the signal is over,
+    each deferred hook is called in a new cursor (with the sender and the
+    records in the arguments bound to it), which is committed after the hook
+    returns, or rolled back if the hook fails.  Any error in a deferred hook
+    is logged and ignored (except for Celery's ``SoftTimeLimitExceeded``).
+
+    Deferred hooks are not included in the responses of `Signal.send`:meth:
+    or `Signal.safe_send`:meth:.
+
+    You don't usually need to call this function.  It's public so that tests
+    (which never commit) can run the deferred hooks.
+
+    .. versionadded:: 2.9.0
+
+    """
+    from celery.exceptions import SoftTimeLimitExceeded
+
+    queue = getattr(cr, _DEFERRED_QUEUE, None)
+    if queue is not None:
+        delattr(cr, _DEFERRED_QUEUE)
+        with api.Environment.manage():
+            for (hook, signal, _, _), (sender, kwargs) in queue.items():
+                try:
+                    with sender.env.registry.cursor() as new_cr:
+                        env = sender.env(cr=new_cr)
+                        kwargs = {
+                            name: _with_env(value, env)
+                            for name, value in kwargs.items()
+                        }
+                        _call_hook(hook, sender.with_env(env), signal, kwargs)
+                except SoftTimeLimitExceeded:
+                    raise
+                except Exception:
+                    logger.exception("Error in deferred hook %s", hook)
+
+
+def _with_env(value, env):
+    if isinstance(value, models.BaseModel):
+        return value.with_env(env)
+    else:
+        return value
+
+
+def _discard_deferred(cr):
+    if hasattr(cr, _DEFERRED_QUEUE):
+        delattr(cr, _DEFERRED_QUEUE)
+
+
+def _defer(hook, sender, signal, kwargs):
+    """Queue the call to `hook` in the cursor of `sender`.
+
+    Return False if the hook must be called right away because there's no
+    transaction to wait for.
+
+    """
+    if not isinstance(sender, models.BaseModel):
+        return False
+    cr = sender.env.cr
+    queue = getattr(cr, _DEFERRED_QUEUE, None)
+    if queue is None:
+        queue = OrderedDict()
+        setattr(cr, _DEFERRED_QUEUE, queue)
+        cr.after("commit", partial(flush_deferred, cr))
+        cr.after("rollback", partial(_discard_deferred, cr))
+    records = kwargs.get("result", None)
+    if not isinstance(records, models.BaseModel) or records._name != sender._name:
+        records = sender
+    if records._ids and signal is not pre_search and signal is not post_search:
+        key = (hook, signal, records._name, records._ids)
+    else:
+        # Searches (and other calls without records) can't be merged: each
+        # one gets a key of its own.
+        key = (hook, signal, records._name, object())
+    previous = queue.get(key, None)
+    if previous is not None:
+        values, new_values = previous[1].get("values", None), kwargs.get("values")
+        if isinstance(values, dict) and isinstance(new_values, dict):
+            kwargs = dict(kwargs, values=dict(values, **new_values))
+    queue[key] = (sender, kwargs)
+    return True
+
+
+def _select_for_hook(hook, kwargs):
+    """Return the keyword arguments to call `hook` with.
+
+    Return None if the `hook` doesn't care about the values being sent.
+
+    """
+    fields = hook.fields
+    values = kwargs.get("values", None)
+    if not fields or values is None:
+        return kwargs
+    if isinstance(values, dict):
+        return kwargs if not fields.isdisjoint(values) else None
+    indexes = [i for i, vals in enumerate(values) if not fields.isdisjoint(vals)]
+    if not indexes:
+        return None
+    elif len(indexes) == len(values):
+        return kwargs
+    result = dict(kwargs, values=[values[i] for i in indexes])
+    records = kwargs.get("result", None)
+    # `create` returns the records in the same order of the values.
+    if isinstance(records, models.BaseModel) and len(records) == len(values):
+        ids = records._ids
+        result["result"] = records.browse([ids[i] for i in indexes])
     return result
 
 
@@ -633,6 +1182,23 @@ post_save = [post_create, post_write, post_unlink]
 
 
 # **************SIGNALS SEND****************
+def _is_listened(sender, *signals):
+    """Check whether any of `signals` has live hooks for `sender`.
+
+    This is a lookup in the dispatch tables of the signals, so that models
+    nobody listens to go straight to the original methods.  While the
+    registry is not ready we don't keep those tables, so we take the long
+    path to avoid computing the live hooks twice.
+
+    """
+    if not sender.pool.ready:
+        return True
+    for signal in signals:
+        if signal.live_hooks(sender):
+            return True
+    return False
+
+
 super_fields_view_get = models.BaseModel.fields_view_get
 super_create = models.BaseModel.create
 super_write = models.BaseModel.write
@@ -645,6 +1211,14 @@ super_search = models.BaseModel.search
 def _fvg_for_signals(
     self, view_id=None, view_type="form", toolbar=False, submenu=False
 ):
+    if not _is_listened(self, pre_fields_view_get, post_fields_view_get):
+        return super_fields_view_get(
+            self,
+            view_id=view_id,
+            view_type=view_type,
+            toolbar=toolbar,
+            submenu=submenu,
+        )
     kwargs = dict(
         view_id=view_id, view_type=view_type, toolbar=toolbar, submenu=submenu
     )
@@ -658,6 +1232,8 @@ def _fvg_for_signals(
 @api.returns("self", lambda value: value.id if value else value)
 @wraps(super_create)
 def _create_for_signals(self, vals):
+    if not _is_listened(self, pre_create, post_create):
+        return super_create(self, vals)
     pre_create.send(sender=self, values=vals)
     res = super_create(self, vals)
     post_create.safe_send(sender=self, result=res, values=vals)
@@ -675,6 +1251,8 @@ def _write_for_signals(self, vals):
 
 @api.multi
 def _unlink_for_signals(self):
+    if not _is_listened(self, pre_unlink, post_unlink):
+        return super_unlink(self)
     pre_unlink.send(self)
     res = super_unlink(self)
     post_unlink.safe_send(self, result=res)
@@ -693,6 +1271,8 @@ Wraps the `write` method.
 @api.multi
 @wraps(_write_for_signals)
 def _write_for_wrappers(self, vals):
+    if not _is_listened(self, write_wrapper, pre_write, post_write):
+        return super_write(self, vals)
     return write_wrapper.perform(_write_for_signals, self, vals)
 
 
@@ -700,16 +1280,88 @@ def _write_for_wrappers(self, vals):
 @api.returns(*super_search._returns)
 @wraps(super_search)
 def _search_for_signals(self, args, offset=0, limit=None, order=None, count=False):
+    if not _is_listened(self, pre_search, post_search):
+        if _is_trivially_unsatisfiable(args):
+            return _get_empty_search_result(self, count)
+        return super_search(
+            self, args, offset=offset, limit=limit, order=order, count=count
+        )
     query = list(args)
     kw_args = dict(offset=offset, limit=limit, order=order, count=count)
     pre_search.send(self, query=query, kw_args=kw_args)
-    result = super_search(self, query, **kw_args)
+    if _is_unsatisfiable(self, query):
+        result = _get_empty_search_result(self, kw_args.get("count"))
+    else:
+        result = super_search(self, query, **kw_args)
     post_search.safe_send(self, query=query, kw_args=kw_args, result=result)
     return result
 
 
+def _is_trivially_unsatisfiable(domain):
+    """Check if `domain` is an AND with the FALSE leaf or an empty 'in'.
+
+    This doesn't allocate, so it can be done for every search.  Other
+    contradictions are looked for only in searches with receivers, see
+    `_is_unsatisfiable`:func:.
+
+    """
+    for term in domain:
+        if isinstance(term, str):
+            if term != "&":
+                return False
+        elif isinstance(term, (list, tuple)) and len(term) == 3:
+            left, op, right = term
+            if _is_false_term(left, op, right):
+                return True
+    return False
+
+
+def _is_false_term(left, op, right):
+    return (left == 0 and op == "=" and right == 1) or (
+        op == "in" and isinstance(right, (list, tuple)) and not right
+    )
+
+
+def _is_unsatisfiable(model, domain):
+    """Check if `domain` cannot match any record of `model`.
+
+    See `xoeuf.osv.expression.Domain.is_unsatisfiable`:meth:.  Domains
+    without the FALSE leaf, an empty 'in', or several terms over the same
+    field can't be contradictory, so they are not analyzed at all.
+
+    """
+    if _is_trivially_unsatisfiable(domain):
+        return True
+    lefts = set()
+    for term in domain:
+        if isinstance(term, (list, tuple)) and len(term) == 3:
+            left, op, right = term
+            if left in lefts or _is_false_term(left, op, right):
+                break
+            lefts.add(left)
+    else:
+        return False
+    try:
+        return Domain(domain).is_unsatisfiable(model)
+    except (AssertionError, TypeError, ValueError):
+        # Let Odoo report invalid domains.
+        return False
+
+
+def _get_empty_search_result(model, count):
+    # Odoo checks the access rights even if the domain doesn't match.
+    model.check_access_rights("read")
+    return 0 if count else model.browse()
+
+
 models.BaseModel.fields_view_get = _fvg_for_signals
 models.BaseModel.create = _create_for_signals
 models.BaseModel.unlink = _unlink_for_signals
 models.BaseModel.write = _write_for_wrappers
 models.BaseModel.search = _search_for_signals
+
+
+@receiver(post_write, sender="ir.module.module", require_registry=False, framework=True)
+def _invalidate_installed_modules(sender, signal, values=None, **kwargs):
+    if values and "state" in values:
+        invalidate_installed_modules(sender.env.registry)
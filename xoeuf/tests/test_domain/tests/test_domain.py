@@ -230,6 +230,139 @@ class TestDomain(BaseCase):
         y = Domain([("field_y", "!=", False), ("field_z", "in", (1, 2, 3))])
         assert x.implies(y)
 
+    def test_simplified_merges_terms(self):
+        domain = Domain(["|", "|", ("x", "=", 2), ("x", "in", [3, 1]), ("x", "=", 2)])
+        self.assertEqual(list(domain.simplified), [("x", "in", (1, 2, 3))])
+
+        domain = Domain([("x", "!=", 1), ("x", "not in", [2, 3]), ("y", "!=", 1)])
+        self.assertEqual(
+            set(domain.simplified), {("x", "not in", (1, 2, 3)), ("y", "!=", 1)}
+        )
+        # Not for traversals, nor for False.
+        domain = Domain([("a.x", "!=", 1), ("a.x", "!=", 2), ("x", "!=", False)])
+        self.assertEqual(len(domain.simplified), 3)
+
+        domain = Domain(
+            [("x", ">", 1), ("x", ">=", 5), ("x", "<", 10), ("x", "<=", 10)]
+        )
+        self.assertEqual(set(domain.simplified), {("x", ">=", 5), ("x", "<", 10)})
+        domain = Domain(["|", ("x", ">", 1), ("x", ">=", 1)])
+        self.assertEqual(list(domain.simplified), [("x", ">=", 1)])
+
+    def test_simplified_or_with_many_children(self):
+        domain = Domain(["|", ("a", "=", 1), "|", ("b", "=", 1), ("a", "=", 0)])
+        self.assertEqual(len(domain.simplified), 5)
+
+    def test_interned_trees(self):
+        A = Domain([("x", "=", 1), "|", ("y", "=", 1), ("z", "!=", 2)])
+        B = Domain(["|", ("z", "!=", 2), ("y", "=", 1), ("w", "=", 1)])
+        tree = A._get_tree()
+        self.assertIs(tree, A._get_tree())
+        self.assertIs(tree, Domain(list(A))._get_tree())
+        shared = {id(child) for child in tree.children}
+        self.assertTrue(shared & {id(child) for child in B._get_tree().children})
+        # Modifying the domain drops its tree.
+        A.append(("w", "=", 1))
+        self.assertIsNot(tree, A._get_tree())
+        self.assertEqual(len(A.simplified), 5)
+
+    def test_interned_trees_keep_types(self):
+        self.assertEqual(list(Domain([("x", "=", 0)]).simplified), [("x", "=", 0)])
+        self.assertEqual(
+            list(Domain([("x", "=", False)]).simplified), [("x", "=", False)]
+        )
+
+    def test_domain_builder(self):
+        builder = expr.DomainBuilder(expr.OR_OPERATOR)
+        self.assertEqual(list(builder.build()), [expr.FALSE_LEAF])
+        for i in range(1, 1001):
+            builder.add([("ref", "=", "model,%d" % i)])
+        builder.add(["&", ("a", "=", 1), ("b", "=", 2)])
+        builder.add([("ref", "in", ["model,1", "model,2000"])])
+        domain = builder.build()
+        self.assertEqual(len(domain), 5)
+        self.assertEqual(domain[1][:2], ("ref", "in"))
+        self.assertEqual(
+            set(domain[1][2]), {"model,%d" % i for i in list(range(1, 1001)) + [2000]}
+        )
+        self.assertEqual(domain[2:], ["&", ("a", "=", 1), ("b", "=", 2)])
+        builder = expr.DomainBuilder()
+        self.assertEqual(list(builder.build()), [expr.TRUE_LEAF])
+        builder.add([("a", "!=", 1)])
+        self.assertEqual(list(builder.build()), [("a", "!=", 1)])
+        builder.add([("a", "<>", 2)]).add([("b.c", "!=", 1)]).add([("b.c", "!=", 2)])
+        self.assertEqual(
+            list(builder.build()),
+            [
+                "&",
+                "&",
+                ("a", "not in", (1, 2)),
+                ("b.c", "!=", 1),
+                ("b.c", "!=", 2),
+            ],
+        )
+
+    def test_domain_builder_without_values(self):
+        builder = expr.DomainBuilder(expr.OR_OPERATOR).add([("x", "in", [])])
+        self.assertEqual(list(builder.build()), [("x", "in", ())])
+        builder.add([("x", "=", 1)])
+        self.assertEqual(list(builder.build()), ["|", ("x", "in", ()), ("x", "=", 1)])
+        builder = expr.DomainBuilder().add([("x", "not in", [])])
+        self.assertEqual(list(builder.build()), [("x", "not in", ())])
+        builder.add([("x", "!=", 1)])
+        self.assertEqual(
+            list(builder.build()), ["&", ("x", "not in", ()), ("x", "!=", 1)]
+        )
+
+    def test_is_unsatisfiable(self):
+        for domain in [
+            Domain.FALSE,
+            [("a", "in", [])],
+            [("a", "=", 1), ("a", "=", 2)],
+            [("a", "=", "draft"), ("a", "in", ["open", "done"])],
+            [("a", ">", 5), ("a", "<", 3)],
+            [("a", ">=", 3), ("a", "<=", 3), ("a", "!=", 3)],
+            [("a", "=", False), ("a", ">", 1)],
+            [("a", "in", [1, 2]), ("a", ">", 2)],
+            [("a", "=", 1), "|", ("a", "=", 2), ("b", "in", [])],
+        ]:
+            self.assertTrue(Domain(domain).is_unsatisfiable(), domain)
+        for domain in [
+            Domain.TRUE,
+            [("a", "=", 1), ("b", "=", 2)],
+            ["|", ("a", "=", 1), ("a", "=", 2)],
+            # Each line may satisfy a term.
+            [("line_ids.a", "=", 1), ("line_ids.a", "=", 2)],
+            # Odoo matches NULL for False (and 0) in 'in'.
+            [("a", "in", [0, 1]), ("a", "=", False)],
+            # The DB may cast '1' to 1.
+            [("a", "=", 1), ("a", "=", "1")],
+            # The collation of the DB may not be Python's.
+            [("a", ">", "b"), ("a", "<", "a")],
+            # Terms which are equal or have the same hash in Python.
+            [("a", "!=", False), "|", ("a", "=", False), ("a", "=", 0)],
+            [("a", "!=", -1), "|", ("a", "=", -1), ("a", "=", -2)],
+        ]:
+            self.assertFalse(Domain(domain).is_unsatisfiable(), domain)
+
+    def test_is_tautology(self):
+        for domain in [
+            Domain.TRUE,
+            [],
+            [("a", "not in", [])],
+            ["|", ("a", "=", False), ("a", "!=", False)],
+            ["|", "|", ("a", "=", 1), ("a", "!=", 1), ("a", "=", False)],
+            ["|", "|", ("a", "!=", -1), ("a", "!=", -2), ("a", "=", False)],
+        ]:
+            self.assertTrue(Domain(domain).is_tautology(), domain)
+        for domain in [
+            Domain.FALSE,
+            [("a", "=", 1)],
+            ["|", ("a", "=", 1), ("a", "!=", 1)],
+            ["|", ("a", "=", False), ("b", "!=", False)],
+        ]:
+            self.assertFalse(Domain(domain).is_tautology(), domain)
+
     def test_walk(self):
         y = Domain(
             [
@@ -343,6 +476,57 @@ class TestDomainFilter(BaseCase):
             )
             self.assertASTEqual(ast, expected)
 
+    def test_asfilter_cache(self):
+        expr.clear_filter_cache()
+        domain = Domain([("state", "in", ["draft", "open"]), ("amount", ">", 0)])
+        fn = domain.asfilter()
+        self.assertIs(fn, Domain(list(domain)).asfilter())
+        self.assertIsNot(fn, domain.asfilter(convert_false=False))
+        info = expr.get_filter_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+        # 0 == False, but they yield different filters.
+        self.assertTrue(Domain([("attr", "=", False)]).asfilter()(opendict(attr=None)))
+        self.assertFalse(Domain([("attr", "=", 0)]).asfilter()(opendict(attr=None)))
+        # Values that remain unhashable after `normalize_leaf` are not cached.
+        unhashable = Domain([("attr", "in", [[1], [2]])])
+        self.assertTrue(unhashable.asfilter()(opendict(attr=[1])))
+        self.assertEqual(expr.get_filter_cache_info().currsize, 4)
+
+    def test_asfilter_reuses_code_of_shape(self):
+        filter42 = Domain([("partner_id", "=", 42)]).asfilter()
+        filter7 = Domain([("partner_id", "=", 7)]).asfilter()
+        self.assertIs(filter42.__code__, filter7.__code__)
+        self.assertTrue(filter42(opendict(partner_id=42)))
+        self.assertFalse(filter7(opendict(partner_id=42)))
+
+    def test_asfilter_values_without_eval_repr(self):
+        class Value:
+            def __repr__(self):
+                return "<not python>"
+
+        value = Value()
+        self.assertTrue(Domain([("attr", "=", value)]).asfilter()(opendict(attr=value)))
+
+    def test_asfilter_traverses_paths_once(self):
+        query = Domain(["|", ("line_ids.state", "=", "open"), ("line_ids.qty", ">", 0)])
+        self.assertASTEqual(
+            query._get_filter_ast(),
+            ql.parse(
+                "lambda this: any(x.state == 'open' or x.qty > 0 "
+                "for x in this.mapped('line_ids'))"
+            ),
+        )
+        # Each term of an AND may be satisfied by a different line.
+        query = Domain([("line_ids.state", "=", "open"), ("line_ids.qty", ">", 0)])
+        self.assertASTEqual(
+            query._get_filter_ast(),
+            ql.parse(
+                "lambda this: (lambda records: "
+                "any(x.state == 'open' for x in records) and "
+                "any(x.qty > 0 for x in records))(this.mapped('line_ids'))"
+            ),
+        )
+
 
 def get_model_domain_machine(this):
     Model = this.env["test_domain.model"]
@@ -365,6 +549,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             age=ages,
@@ -379,6 +564,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(ages=s.lists(ages))
         def find_by_ages(self, ages):
@@ -386,6 +572,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             ages=s.lists(ages),
@@ -399,6 +586,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(ages=s.lists(ages))
         def find_by_not_ages(self, ages):
@@ -406,6 +594,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             ages=s.lists(ages),
@@ -419,12 +608,27 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(domain=domains(fields=s.just("age")))
         def find_by_arbitrary_domain(self, domain):
             res = Model.search(domain)
             logger.info("Check filter/domain: %s; count: %s", domain, len(res))
             this.assertEqualRecordset(res.filtered(domain.asfilter()), res)
+            this.assertFilters(domain, res)
+
+        @rule(
+            domain=domains(
+                fields=s.sampled_from(
+                    ["age", "children_ids.age", "parent_id.children_ids.age"]
+                )
+            )
+        )
+        def find_by_arbitrary_path_domain(self, domain):
+            res = Model.search(domain)
+            logger.info("Check filter/domain: %s; count: %s", domain, len(res))
+            this.assertEqualRecordset(res.filtered(domain.asfilter()), res)
+            this.assertFilters(domain, res)
 
         @rule(name=names, op=all_operators)
         def find_by_name(self, name, op):
@@ -432,6 +636,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             name=names,
@@ -446,6 +651,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(names=s.lists(names))
         def find_by_names(self, names):
@@ -453,6 +659,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             names=s.lists(names),
@@ -466,6 +673,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(names=s.lists(names))
         def find_by_not_names(self, names):
@@ -473,6 +681,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
         @rule(
             names=s.lists(names),
@@ -486,6 +695,7 @@ def get_model_domain_machine(this):
             res = Model.search(query)
             logger.info("Check filter/domain: %s; count: %s", query, len(res))
             this.assertEqualRecordset(res.filtered(query.asfilter()), res)
+            this.assertFilters(query, res)
 
     return ModelDomainMachine
 
@@ -498,5 +708,49 @@ class TestConsistencyOfFilters(TransactionCase):
             rs1, rs2, msg="ours: {0!r}; theirs: {1!r}".format(ours, theirs)
         )
 
+    def assertFilters(self, domain, res):
+        self.assertEqualRecordset(domain.filter_records(res), res)
+        everything = res.search([])
+        self.assertEqualRecordset(
+            domain.filter_records(everything), everything.filtered(domain.asfilter())
+        )
+        self.assertEqualRecordset(self.select(domain, res), res)
+        self.assertEqualRecordset(self.select(domain, res, alias="t"), res)
+
+    def select(self, domain, model, alias=None):
+        where, params, joins = domain.to_sql(model, alias=alias)
+        table = '"%s"' % model._table
+        if alias:
+            table += ' AS "%s"' % alias
+        self.env.cr.execute(
+            'SELECT "{alias}".id FROM {tables} WHERE {where}'.format(
+                alias=alias or model._table,
+                tables=", ".join([table] + joins),
+                where=where,
+            ),
+            params,
+        )
+        return model.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def test_to_sql_by_shape(self):
+        Model = self.env["test_domain.model"]
+        Model.create({"name": "a", "age": 10})
+        Model.create({"name": "b", "age": 20})
+        expr.clear_sql_cache()
+        where, params, joins = Domain([("age", ">", 15)]).to_sql(Model, alias="t")
+        self.assertEqual(params, [15])
+        self.assertEqual(joins, [])
+        self.assertIn('"t"."age"', where)
+        self.assertEqual(
+            Domain([("age", ">", 5)]).to_sql(Model, alias="t"), (where, [5], [])
+        )
+        self.assertEqual(self.select(Domain([("age", ">", 15)]), Model, "t").age, 20)
+        self.assertEqual(len(self.select(Domain([("age", ">", 5)]), Model, "t")), 2)
+        # Other domains are not cached, and the alias is used in a sub-query.
+        where, params, joins = Domain([("parent_id.age", "=", 10)]).to_sql(
+            Model, alias="t"
+        )
+        self.assertTrue(where.startswith('"t"."id" IN (SELECT'))
+
     def test_consistency_of_domains(self):
         run_state_machine_as_test(get_model_domain_machine(self))
@@ -63,6 +63,10 @@ class Model(models.Model):
 
     car = fields.Enumeration(CARS)
     pax = fields.Enumeration(Pax)
+    parent_id = fields.Many2one("test.enum.model")
+
+    color_code = fields.Enumeration(COLORS, storage="int")
+    car_code = fields.Enumeration(CARS, storage="int", codes={"FORD": 1, "CHEV": 2})
 
     def _get_enumclass(self):
         if self._name == "test.enum.model_delegated":
@@ -80,6 +84,13 @@ class Model(models.Model):
     dynamic_enum = fields.Enumeration(_get_enumclass)
 
 
+class CharModel(models.Model):
+    _name = "test.enum.model_char"
+    _inherit = "test.enum.model"
+
+    car = fields.Char()
+
+
 class DelegatedModel(models.Model):
     _name = "test.enum.model_delegated"
     _inherits = {"test.enum.model": "model_id"}
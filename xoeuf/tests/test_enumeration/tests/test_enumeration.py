@@ -96,6 +96,149 @@ class TestEnum(TransactionCase):
             with self.assertRaises(ValueError):
                 self.EnumModel.search([("car", "=", 1)])
 
+    def test_search_dotted_path(self):
+        self.EnumModel.search([]).unlink()
+        with force_ready(self.env.registry):
+            parent = self.EnumModel.create({"car": CARS.FORD})
+            obj = self.EnumModel.create({"car": CARS.CHEV, "parent_id": parent.id})
+            self.EnumModel.invalidate_cache()
+            self.assertEqual(
+                self.EnumModel.search([("parent_id.car", "=", CARS.FORD)]), obj
+            )
+            self.assertEqual(
+                self.EnumModel.search(
+                    [("parent_id.car", "in", [CARS.CHEV]), ("car", "=", CARS.CHEV)]
+                ),
+                self.EnumModel,
+            )
+            with self.assertRaises(ValueError):
+                self.EnumModel.search([("parent_id.car", "=", 1)])
+
+    def test_search_plans(self):
+        plan = self.EnumModel._get_enumeration_search_plan
+        self.assertEqual(plan([("name", "=", 1)]), ())
+        domain = ["|", ("car", "=", CARS.FORD), ("parent_id.color", "in", [1])]
+        self.assertEqual(
+            plan(domain),
+            (
+                (1, self.EnumModel._fields["car"]),
+                (2, self.EnumModel._fields["color"]),
+            ),
+        )
+        self.assertIs(
+            plan(domain), plan(["|", ("car", "=", 1), ("parent_id.color", "in", [])])
+        )
+        with self.assertRaises(TypeError):
+            plan([("car", "<", CARS.FORD)])
+
+    def test_create_keeps_values(self):
+        values = {"car": CARS.FORD, "pax": 1}
+        with force_ready(self.env.registry):
+            objs = self.EnumModel.create([values, {}])
+        self.assertEqual(values, {"car": CARS.FORD, "pax": 1})
+        self.assertIs(objs[0].car, CARS.FORD)
+
+    def test_int_storage(self):
+        from odoo.tools import sql
+
+        columns = sql.table_columns(self.env.cr, self.EnumModel._table)
+        self.assertEqual(columns["color_code"]["udt_name"], "int2")
+        self.assertEqual(columns["car_code"]["udt_name"], "int2")
+        self.EnumModel.search([]).unlink()
+        with force_ready(self.env.registry):
+            obj = self.EnumModel.create({"color_code": 2, "car_code": CARS.CHEV})
+            self.EnumModel.invalidate_cache()
+            self.assertIs(obj.color_code, COLORS.Green)
+            self.assertIs(obj.car_code, CARS.CHEV)
+            self.env.cr.execute(
+                "SELECT color_code, car_code FROM test_enum_model WHERE id=%s",
+                [obj.id],
+            )
+            self.assertEqual(self.env.cr.fetchall(), [(2, 2)])
+            obj.write({"car_code": CARS.FORD})
+            self.assertEqual(self.EnumModel.search([("car_code", "=", CARS.FORD)]), obj)
+            self.assertEqual(
+                self.EnumModel.search([("color_code", "in", [COLORS.Green])]), obj
+            )
+            with self.assertRaises(ValueError):
+                obj.write({"car_code": "FORD"})
+            with self.assertRaises(TypeError):
+                self.EnumModel.search([("car_code", "ilike", CARS.FORD)])
+
+    def test_int_storage_zero_code(self):
+        # Odoo takes 0 as False in 'in' and 'not in'.
+        self.EnumModel.search([]).unlink()
+        with force_ready(self.env.registry):
+            blue = self.EnumModel.create({"color_code": COLORS.Blue})
+            green = self.EnumModel.create({"color_code": COLORS.Green})
+            empty = self.EnumModel.create({})
+            search = self.EnumModel.search
+            self.assertEqual(search([("color_code", "in", [COLORS.Blue])]), blue)
+            self.assertEqual(
+                search([("color_code", "in", [COLORS.Blue, COLORS.Green])]),
+                blue | green,
+            )
+            self.assertEqual(
+                search([("color_code", "not in", [COLORS.Blue])]), green | empty
+            )
+            self.assertEqual(
+                search([("color_code", "not in", [COLORS.Blue, COLORS.Green])]),
+                empty,
+            )
+            self.assertEqual(search([("color_code", "=", COLORS.Blue)]), blue)
+
+    def test_enumeration_codes(self):
+        from xoeuf.fields.enumeration import get_enumeration_codes
+
+        self.assertEqual(
+            get_enumeration_codes(COLORS), {"Blue": 0, "Red": 1, "Green": 2}
+        )
+        with self.assertRaises(ValueError):
+            get_enumeration_codes(CARS)
+        with self.assertRaises(ValueError):
+            get_enumeration_codes(CARS, {"FORD": 1, "CHEV": 1})
+        with self.assertRaises(ValueError):
+            get_enumeration_codes(COLORS, {"Red": 10})
+
+    def test_convert_enumeration_column(self):
+        from xoeuf.fields.enumeration import (
+            convert_enumeration_column,
+            get_enumeration_codes,
+        )
+
+        cr = self.env.cr
+        codes = get_enumeration_codes(CARS, {"FORD": 1, "CHEV": 2})
+        cr.execute("CREATE TABLE test_enum_column (id serial, car varchar)")
+        cr.execute("INSERT INTO test_enum_column (car) VALUES ('CHEV'), (NULL)")
+        self.assertTrue(
+            convert_enumeration_column(cr, "test_enum_column", "car", codes)
+        )
+        self.assertFalse(
+            convert_enumeration_column(cr, "test_enum_column", "car", codes)
+        )
+        cr.execute("SELECT car FROM test_enum_column ORDER BY id")
+        self.assertEqual(cr.fetchall(), [(2,), (None,)])
+        self.assertTrue(
+            convert_enumeration_column(
+                cr, "test_enum_column", "car", codes, storage="char"
+            )
+        )
+        cr.execute("SELECT car FROM test_enum_column ORDER BY id")
+        self.assertEqual(cr.fetchall(), [("CHEV",), (None,)])
+        cr.execute("INSERT INTO test_enum_column (car) VALUES ('TOYOTA')")
+        with self.assertRaises(ValueError):
+            convert_enumeration_column(cr, "test_enum_column", "car", codes)
+
+    def test_overridden_enumeration(self):
+        CharModel = self.env["test.enum.model_char"]
+        self.assertIn("color", CharModel._enumeration_fnames)
+        self.assertNotIn("car", CharModel._enumeration_fnames)
+        with force_ready(self.env.registry):
+            obj = CharModel.create({"car": "FORD", "color": COLORS.Green})
+            self.assertEqual(obj.car, "FORD")
+            self.assertEqual(CharModel.search([("car", "ilike", "FO")]), obj)
+            self.assertEqual(CharModel.search([("color", "=", COLORS.Green)]), obj)
+
     def test_performance(self):
         from xoeuf.fields.enumeration import EnumerationAdapter
 
@@ -229,6 +372,24 @@ class TestEnum(TransactionCase):
         Enumclass = self.DelegatedModel._fields["dynamic_enum"].Enumclass
         self.assertEqual(Enumclass.name.value, "Dynamic")
 
+    def test_members_index(self):
+        from xoeuf.fields.enumeration import _get_members_index
+
+        field = self.EnumModel._fields["color"]
+        self.assertEqual(field._members_by_value, _get_members_index(COLORS))
+        self.assertEqual(field.get_member_by_value(1), ("Red", COLORS.Red))
+        self.assertEqual(field.get_member_by_value(COLORS.Red), ("Red", COLORS.Red))
+        with self.assertRaises(ValueError):
+            field.get_member_by_value(10)
+        with self.assertRaises(ValueError):
+            field.get_member_by_value([1])
+
+        class Unhashable(object):
+            one = [1]
+            __members__ = {"one": one}
+
+        self.assertIsNone(_get_members_index(Unhashable))
+
 
 @contextlib.contextmanager
 def force_ready(registry):
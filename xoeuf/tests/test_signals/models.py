@@ -33,6 +33,7 @@ class SignalingModel(models.Model):
     _inherit = ["test_signals.fvg"]
 
     name = fields.Char()
+    number = fields.Integer()
 
 
 @signals.receiver(signals.post_save, sender="test_signals.signaling_model")
@@ -6,6 +6,8 @@
 #
 # This is free software; you can do what the LICENCE file allows you to.
 #
+from unittest.mock import patch
+
 from xotl.tools.future.codecs import safe_decode
 
 from xoeuf.signals import (
@@ -15,6 +17,16 @@ from xoeuf.signals import (
     write_wrapper,
     pre_fields_view_get,
     no_signals,
+    get_installed_modules,
+    invalidate_installed_modules,
+    post_write,
+    pre_search,
+    flush_deferred,
+    enable_stats,
+    disable_stats,
+    reset_stats,
+    get_stats,
+    format_stats,
 )
 
 from odoo.tests.common import TransactionCase, at_install, post_install
@@ -110,3 +122,167 @@ class TestXoeufSignals(TransactionCase):
             # create.
             self.assertEqual(mock.call_count, 1)
             self.assertEqual(len(result), 2)
+
+    def test_installed_modules_index(self):
+        installed = get_installed_modules(self.env)
+        self.assertIn("base", installed)
+        self.assertIn("test_signals", installed)
+        # The index is kept while the registry is ready.
+        self.assertIs(installed, get_installed_modules(self.env))
+        invalidate_installed_modules(self.env.registry)
+        rebuilt = get_installed_modules(self.env)
+        self.assertIsNot(installed, rebuilt)
+        self.assertEqual(installed, rebuilt)
+
+    def test_dispatch_tables(self):
+        hooks = pre_create.live_hooks(self.Model)
+        self.assertIsInstance(hooks, tuple)
+        self.assertIn(pre_save_receiver, hooks)
+        # The live hooks are computed once per model.
+        self.assertIs(hooks, pre_create.live_hooks(self.Model))
+        partners = self.env["res.partner"]
+        self.assertNotIn(pre_save_receiver, pre_create.live_hooks(partners))
+
+        def _receiver(sender, signal, **kwargs):
+            pass
+
+        post_write.connect(_receiver, sender="test_signals.signaling_model")
+        try:
+            self.assertIn(_receiver, post_write.live_hooks(self.Model))
+        finally:
+            post_write.disconnect(_receiver, sender="test_signals.signaling_model")
+        self.assertNotIn(_receiver, post_write.live_hooks(self.Model))
+        with no_signals(pre_create):
+            self.assertFalse(pre_create.live_hooks(self.Model))
+        self.assertIn(pre_save_receiver, pre_create.live_hooks(self.Model))
+
+    def test_no_dispatch_without_listeners(self):
+        with patch.object(pre_search, "send") as send:
+            self.env["res.country"].search([("code", "=", "CU")])
+            self.assertFalse(send.called)
+            self.Model.search([])
+            self.assertTrue(send.called)
+
+    def test_unsatisfiable_search(self):
+        Country = self.env["res.country"]
+        contradiction = [("code", "=", "CU"), ("code", "=", "US")]
+        with patch("xoeuf.signals.super_search") as search:
+            self.assertFalse(Country.search([("id", "in", [])]))
+            domain = ["&", (0, "=", 1), ("id", "=", 1)]
+            self.assertEqual(Country.search(domain, count=True), 0)
+            with patch.object(pre_search, "send") as send:
+                self.assertFalse(self.Model.search([("name", "in", [])]))
+                names = [("name", "=", "a"), ("name", "=", "b")]
+                self.assertFalse(self.Model.search(names))
+                self.assertEqual(self.Model.search(names, count=True), 0)
+                self.assertTrue(send.called)
+            self.assertFalse(search.called)
+            # Without receivers only the FALSE leaf and empty 'in' are
+            # checked.
+            Country.search(contradiction)
+            self.assertTrue(search.called)
+        self.assertTrue(Country.search([("code", "=", "CU"), ("code", "!=", "US")]))
+        # 0 is not False, even if they are equal in Python.
+        record = self.Model.create(dict(name="Zero", number=0))
+        domain = [
+            ("number", "!=", False),
+            "|",
+            ("number", "=", False),
+            ("number", "=", 0),
+        ]
+        self.assertIn(record, self.Model.search(domain))
+
+    def test_receivers_with_fields(self):
+        calls = []
+
+        def _receiver(sender, signal, values=None, result=None, **kwargs):
+            calls.append((signal, values, result))
+
+        post_create.connect(_receiver, sender=self.Model._name, fields=["name"])
+        post_write.connect(_receiver, sender=self.Model._name, fields="name")
+        try:
+            result = self.Model.create([dict(name="My name"), dict()])
+            self.assertEqual(len(calls), 1)
+            _, values, records = calls.pop()
+            self.assertEqual(values, [dict(name="My name")])
+            self.assertEqual(records, result[0])
+            result.write({})
+            self.assertFalse(calls)
+            result.write(dict(name="Another name"))
+            self.assertEqual(len(calls), 1)
+        finally:
+            post_create.disconnect(_receiver, sender=self.Model._name)
+            post_write.disconnect(_receiver, sender=self.Model._name)
+
+    def test_deferred_receivers(self):
+        calls = []
+
+        def _receiver(sender, signal, values=None, **kwargs):
+            calls.append((sender, values))
+
+        post_write.connect(_receiver, sender=self.Model._name, deferred=True)
+        try:
+            record = self.Model.create(dict(name="My name"))
+            responses = post_write.safe_send(record, result=True, values={})
+            self.assertNotIn(_receiver, [hook for hook, _ in responses])
+            record.write(dict(name="Another name"))
+            record.write(dict(name="Final name"))
+            self.assertFalse(calls)
+            flush_deferred(self.env.cr)
+            self.assertEqual(calls, [(record, dict(name="Final name"))])
+            # The hook is called in a cursor of its own.
+            self.assertIsNot(calls[0][0].env.cr, self.env.cr)
+            flush_deferred(self.env.cr)
+            self.assertEqual(len(calls), 1)
+        finally:
+            post_write.disconnect(_receiver, sender=self.Model._name)
+
+    def test_deferred_searches(self):
+        queries = []
+
+        def _receiver(sender, signal, query=None, **kwargs):
+            queries.append(query)
+
+        pre_search.connect(_receiver, sender=self.Model._name, deferred=True)
+        try:
+            self.Model.search([("name", "=", "a")])
+            self.Model.search([("name", "=", "b")])
+            flush_deferred(self.env.cr)
+            self.assertEqual(queries, [[("name", "=", "a")], [("name", "=", "b")]])
+        finally:
+            pre_search.disconnect(_receiver, sender=self.Model._name)
+
+    def test_background_wrappers(self):
+        steps = []
+
+        def _wrapper(sender, signal, *args, **kwargs):
+            steps.append("before")
+            yield
+            steps.append("after")
+
+        write_wrapper.connect(_wrapper, sender=self.Model._name, background=True)
+        try:
+            who = self.Model.create(dict(name="My name"))
+            who.write(dict(name="My new name"))
+            # The part after the yield waits for the commit, which never
+            # happens in tests.
+            self.assertEqual(steps, ["before"])
+        finally:
+            write_wrapper.disconnect(_wrapper, sender=self.Model._name)
+
+    def test_stats(self):
+        reset_stats()
+        self.Model.create(dict(name="My name"))
+        self.assertFalse(get_stats())
+        enable_stats()
+        try:
+            self.Model.create(dict(name="My name"))
+        finally:
+            disable_stats()
+        stats = {(stat.hook, stat.signal, stat.model): stat for stat in get_stats()}
+        stat = stats[(pre_save_receiver, "pre_create", self.Model._name)]
+        self.assertEqual(stat.count, 1)
+        self.assertGreaterEqual(stat.p99, stat.p50)
+        self.assertIn('signal="pre_create"', format_stats())
+        reset_stats()
+        self.assertFalse(get_stats())
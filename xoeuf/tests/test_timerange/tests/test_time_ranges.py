@@ -38,3 +38,27 @@ class TestTimeRange(TransactionCase):
         obj.tz = "America/Havana"
 
         self.assertEqual(obj.range_datetime, "morning")
+
+    def test_selector_is_kept(self):
+        field = self.Model._fields["range_value"]
+        selector = field._get_selector(self.env)
+        self.assertIs(field._get_selector(self.env), selector)
+        self.Model.create([dict(time_value=Hours[key]) for key in Hours])
+        self.assertIs(field._get_selector(self.env), selector)
+
+    def test_selector_overlapping_ranges(self):
+        from datetime import time
+        from xoeuf.fields.timerange import TimeRangeSelector
+
+        selector = TimeRangeSelector(
+            [
+                ("day", "Day", "8:00", "17:00"),
+                ("lunch", "Lunch", "12:00", "13:00"),
+                ("evening", "Evening", "17:00", "20:00"),
+            ]
+        )
+        self.assertEqual(selector.get_range(time(12, 30)).name, "day")
+        self.assertEqual(selector.get_range(time(17, 0)).name, "day")
+        self.assertEqual(selector.get_range(time(17, 1)).name, "evening")
+        self.assertIsNone(selector.get_range(time(7, 59)))
+        self.assertIsNone(selector.get_range(time(20, 0, 1)))
@@ -89,3 +89,64 @@ class TestFromActiveIds(TransactionCase):
         user = self.env.user
         # Just check we don't raise an exception.
         user._validate_fields("unknown_field_name_" + str(id(self)))
+
+    def test_onupdate_delayed_until_recompute(self):
+        user = self.env.user
+        other = user.create({"login": "other_user", "name": "other"})
+        text_field = "text_field"
+        (user | other).write({"text_field": text_field})
+        with self.env.norecompute():
+            user.name = "john doe"
+            other.partner_id.name = "jane doe"
+            self.assertEqual(user.text_field, text_field)
+            self.assertEqual(other.text_field, text_field)
+        user.recompute()
+        self.assertEqual(user.text_field, user.get_text_field())
+        self.assertEqual(other.text_field, other.get_text_field())
+
+    def test_onupdate_without_recompute(self):
+        # Nobody calls recompute() after a write without recompute.
+        user = self.env.user
+        user.text_field = "text_field"
+        user.with_context(recompute=False).write({"name": "john doe"})
+        self.assertEqual(user.text_field, user.get_text_field())
+
+    def test_onupdate_inverse_paths(self):
+        Users = self.env["res.users"]
+        self.assertEqual(
+            Users._onupdate_inverses["partner_id"], ("res.partner", "user_ids")
+        )
+        # There's no field in 'res.users' pointing back to the model.
+        Model = self.env["text.onupdate.big.model"]
+        self.assertIsNone(Model._onupdate_inverses["user_id"])
+
+        # The updater gets the users of the modified partner, found through
+        # the inverse field.
+        user = self.env.user
+        other = Users.create({"login": "other_user", "name": "other"})
+        (user | other).write({"text_field": "text_field"})
+        user.partner_id.name = "john doe"
+        self.assertEqual(user.text_field, user.get_text_field())
+        self.assertEqual(other.text_field, "text_field")
+
+        # Without inverse, the records are searched.
+        obj = Model.create({"user_id": user.id})
+        obj2 = Model.create({"user_id": other.id})
+        (obj | obj2).write({"name": "name"})
+        user.partner_id.name = "jane doe"
+        self.assertEqual(obj.name, "Updated: jane doe")
+        self.assertEqual(obj2.name, "name")
+
+    def test_onupdate_fnames(self):
+        self.assertLessEqual({"partner_id", "name"}, self.env.user._onupdate_fnames)
+        self.assertIn("name", self.env["res.partner"]._onupdate_fnames)
+        Model = self.env["xoeuf.tests.test_api.model"]
+        self.assertFalse(Model._onupdate_fnames)
+
+    def test_onupdate_with_iterators(self):
+        user = self.env.user
+        user.text_field = "text_field"
+        user.execute_onupdate(fname for fname in ["login"])
+        self.assertEqual(user.text_field, "text_field")
+        user.execute_onupdate(fname for fname in ["login", "name"])
+        self.assertEqual(user.text_field, user.get_text_field())